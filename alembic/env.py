@@ -9,6 +9,7 @@ from alembic import context
 
 from src.Models.base import Base
 from src.Models.User import User
+from src.config.pool import engine_options
 from src.config.settings import get_settings
 
 # this is the Alembic Config object, which provides
@@ -76,6 +77,7 @@ async def run_async_migrations() -> None:
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
+        connect_args=engine_options()["connect_args"],
     )
 
     async with connectable.connect() as connection:
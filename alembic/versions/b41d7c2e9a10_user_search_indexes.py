@@ -0,0 +1,51 @@
+"""user_search_indexes
+
+Revision ID: b41d7c2e9a10
+Revises: 7ff9e90adeb5
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41d7c2e9a10'
+down_revision: Union[str, Sequence[str], None] = '7ff9e90adeb5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRGM_INDEXES = ("email", "first_name", "last_name")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY не блокирует запись в users, но не работает внутри транзакции
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_email_lower_pattern',
+            'users',
+            [sa.text('lower(email) text_pattern_ops')],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for field in TRGM_INDEXES:
+            op.create_index(
+                f'ix_users_{field}_trgm',
+                'users',
+                [sa.text(f'lower({field}) gin_trgm_ops')],
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for field in TRGM_INDEXES:
+            op.drop_index(f'ix_users_{field}_trgm', table_name='users', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_users_email_lower_pattern', table_name='users', postgresql_concurrently=True, if_exists=True)
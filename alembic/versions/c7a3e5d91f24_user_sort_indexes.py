@@ -0,0 +1,60 @@
+"""user_sort_indexes
+
+Revision ID: c7a3e5d91f24
+Revises: b41d7c2e9a10
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a3e5d91f24'
+down_revision: Union[str, Sequence[str], None] = 'b41d7c2e9a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# поля User.sortable (кроме id): индекс (поле, id) под ORDER BY поле, id
+SORT_INDEXES = ("email", "created_at", "last_name", "role")
+# частичные индексы под редкие значения фильтров
+PARTIAL_INDEXES = {
+    'ix_users_inactive_id': 'NOT is_active',
+    'ix_users_admin_id': "role = 'admin'",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY не блокирует запись в users, но не работает внутри транзакции.
+    # Если построение прервалось, индекс остаётся INVALID — его нужно удалить
+    # (DROP INDEX CONCURRENTLY) и повторить миграцию, if_not_exists его не пересоздаст.
+    with op.get_context().autocommit_block():
+        for field in SORT_INDEXES:
+            op.create_index(
+                f'ix_users_{field}_id',
+                'users',
+                [field, 'id'],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name, where in PARTIAL_INDEXES.items():
+            op.create_index(
+                name,
+                'users',
+                ['id'],
+                postgresql_where=sa.text(where),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in PARTIAL_INDEXES:
+            op.drop_index(name, table_name='users', postgresql_concurrently=True, if_exists=True)
+        for field in SORT_INDEXES:
+            op.drop_index(f'ix_users_{field}_id', table_name='users', postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,91 @@
+"""OFFSET vs keyset для списка пользователей на большой таблице.
+
+Засеять несколько миллионов синтетических пользователей (один INSERT ... SELECT
+generate_series) и сравнить стоимость страницы на разной глубине:
+
+    uv run python benchmarks/admin_pagination.py --seed 3000000
+    uv run python benchmarks/admin_pagination.py --order-by created_at --depths 0 10000 100000 1000000
+
+Запросы строятся теми же get_filter_statement / get_keyset_statement, что и в API.
+Время OFFSET растёт с глубиной, keyset остаётся постоянным.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select, text  # noqa: E402
+
+from src.Models.User import User  # noqa: E402
+from src.config.core import engine, local_session  # noqa: E402
+from src.schemes.pagination_filter import PaginationFilter  # noqa: E402
+
+SEED = text("""
+INSERT INTO users (email, first_name, last_name, hash_password, is_active, role, created_at)
+SELECT 'bench-' || md5(random()::text) || '-' || g || '@example.com', 'Bench', 'User' || g,
+       'x', true, 'user', now() - g * interval '1 second'
+FROM generate_series(1, :count) AS g
+""")
+
+
+async def timed(session, statement, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        (await session.scalars(statement)).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+async def main(seed: int, order_by: str, direction: str, size: int, depths: list[int], repeats: int) -> None:
+    async with local_session() as session:
+        if seed:
+            started = time.perf_counter()
+            await session.execute(SEED, {"count": seed})
+            await session.commit()
+            await session.execute(text("ANALYZE users"))
+            print(f"seeded {seed} users in {time.perf_counter() - started:.1f}s")
+
+        total = await session.scalar(select(User.id).order_by(User.id.desc()).limit(1))
+        print(f"users (max id): {total}, order_by={order_by} {direction}, size={size}")
+        print(f"{'depth':>10} {'offset ms':>10} {'keyset ms':>10}")
+        field = getattr(User, order_by)
+        for depth in depths:
+            offset_params = PaginationFilter(
+                page=depth, size=size, order_by=order_by, order_by_direction=direction, extra=None
+            )
+            offset_ms = await timed(session, User.get_filter_statement(offset_params), repeats)
+
+            # курсор на той же глубине — значение последней строки предыдущей страницы
+            after = None
+            if depth:
+                order = field.desc() if direction == "desc" else field.asc()
+                id_order = User.id.desc() if direction == "desc" else User.id.asc()
+                row = (await session.execute(
+                    select(field, User.id).order_by(order, id_order).offset(depth - 1).limit(1)
+                )).first()
+                if row is None:
+                    break
+                after = tuple(row)
+            keyset_params = PaginationFilter(
+                page=None, size=size, order_by=order_by, order_by_direction=direction, extra=None
+            )
+            keyset_ms = await timed(session, User.get_keyset_statement(keyset_params, after), repeats)
+            print(f"{depth:>10} {offset_ms:>10.2f} {keyset_ms:>10.2f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seed", type=int, default=0, help="сколько синтетических пользователей добавить")
+    parser.add_argument("--order-by", choices=User.sortable, default="id")
+    parser.add_argument("--direction", choices=("asc", "desc"), default="desc")
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 1000, 10000, 100000, 1000000])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.seed, args.order_by, args.direction, args.size, args.depths, args.repeats))
@@ -0,0 +1,66 @@
+"""Конкурентная регистрация: много клиентов регистрируют одни и те же email.
+
+Запускать против работающего сервиса:
+
+    uv run python benchmarks/concurrent_registration.py --emails 50 --clients-per-email 10
+
+На каждый email должен прийти не больше одного 201, остальные — 409
+(или 503, если сработало ограничение параллельного хэширования —
+для чистого замера поднять PASSWORD_HASHING_MAX_QUEUE).
+До INSERT ... ON CONFLICT часть гонок заканчивалась 500 (IntegrityError
+на ix_users_email), а каждая регистрация стоила двух запросов к БД.
+"""
+import argparse
+import asyncio
+import collections
+import time
+import uuid
+
+import httpx
+
+
+async def register(client: httpx.AsyncClient, email: str, latencies: list[float]) -> int:
+    started = time.perf_counter()
+    response = await client.post("/v1/auth/register", json={
+        "first_name": "Bench",
+        "last_name": "User",
+        "email": email,
+        "password": "benchmark-password",
+        "password2": "benchmark-password",
+    })
+    latencies.append(time.perf_counter() - started)
+    return response.status_code
+
+
+async def main(base_url: str, emails: int, clients_per_email: int) -> None:
+    run = uuid.uuid4().hex[:8]
+    targets = [f"bench-{run}-{i}@example.com" for i in range(emails)]
+    latencies: list[float] = []
+    limits = httpx.Limits(max_connections=emails * clients_per_email)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        started = time.perf_counter()
+        attempts = [email for email in targets for _ in range(clients_per_email)]
+        codes = await asyncio.gather(*(register(client, email, latencies) for email in attempts))
+        elapsed = time.perf_counter() - started
+
+    statuses = collections.Counter(codes)
+    created = collections.Counter(email for email, code in zip(attempts, codes) if code == 201)
+    latencies.sort()
+    print(f"requests: {len(codes)} in {elapsed:.2f}s ({len(codes) / elapsed:.0f} req/s)")
+    print(f"statuses: {dict(sorted(statuses.items()))}")
+    print(f"p50 {latencies[len(latencies) // 2] * 1000:.1f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+    duplicates = [email for email, count in created.items() if count > 1]
+    unexpected = set(statuses) - {201, 409, 503}
+    if duplicates or unexpected:
+        print(f"FAIL: duplicates={duplicates[:5]} unexpected statuses={sorted(unexpected)}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--emails", type=int, default=50)
+    parser.add_argument("--clients-per-email", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.emails, args.clients_per_email))
@@ -0,0 +1,46 @@
+"""Пропускная способность encode/decode JWT: PyJWT и TokenCodec.
+
+    uv run python benchmarks/jwt_codec.py --iterations 50000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import jwt as pyjwt
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.security.token_codec import TokenCodec  # noqa: E402
+
+SECRET = "benchmark-secret-key-benchmark-secret-key"
+ALGORITHM = "HS256"
+
+
+def payload() -> dict:
+    return {"sub": "42", "exp": int(time.time()) + 600, "type": "access"}
+
+
+def bench(name: str, func, iterations: int) -> None:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - started
+    print(f"{name:<24} {iterations / elapsed:>12,.0f} ops/s  {elapsed / iterations * 1e6:>8.2f} us/op")
+
+
+def main(iterations: int) -> None:
+    codec = TokenCodec(SECRET, ALGORITHM, access_ttl=600, refresh_ttl=86400)
+    token = codec.encode(payload())
+
+    bench("pyjwt encode", lambda: pyjwt.encode(payload(), SECRET, algorithm=ALGORITHM), iterations)
+    bench("TokenCodec encode", lambda: codec.encode(payload()), iterations)
+    print()
+    bench("pyjwt decode", lambda: pyjwt.decode(token, SECRET, algorithms=[ALGORITHM]), iterations)
+    bench("TokenCodec decode", lambda: codec.decode(token), iterations)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50000)
+    main(parser.parse_args().iterations)
@@ -0,0 +1,81 @@
+"""Латентность GET /v1/auth/me во время потока логинов.
+
+Запускать против работающего сервиса с засеянной базой (seed_db.py):
+
+    uv run python benchmarks/me_latency_under_login_flood.py --flood 50 --duration 15
+
+До выноса bcrypt из event loop p99 для /me растёт до сотен миллисекунд,
+после — остаётся на уровне обычного запроса.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    index = min(int(len(ordered) * p / 100), len(ordered) - 1)
+    return ordered[index]
+
+
+async def login_flood(client: httpx.AsyncClient, email: str, password: str, stop: asyncio.Event) -> int:
+    done = 0
+    while not stop.is_set():
+        await client.post("/v1/auth/login", json={"email": email, "password": password})
+        done += 1
+    return done
+
+
+async def probe_me(client: httpx.AsyncClient, stop: asyncio.Event, interval: float) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/v1/auth/me")
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def main(args: argparse.Namespace) -> None:
+    limits = httpx.Limits(max_connections=args.flood + 10)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as flood_client, \
+            httpx.AsyncClient(base_url=args.base_url, timeout=60) as probe_client:
+        response = await probe_client.post(
+            "/v1/auth/login", json={"email": args.email, "password": args.password}
+        )
+        response.raise_for_status()
+        # cookie выставлены с secure=True, по http httpx их сам не отправит
+        probe_client.cookies.set("access_token", response.cookies["access_token"])
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_me(probe_client, stop, args.interval))
+        flood = [
+            asyncio.create_task(login_flood(flood_client, args.email, args.password, stop))
+            for _ in range(args.flood)
+        ]
+        await asyncio.sleep(args.duration)
+        stop.set()
+        latencies = await probe
+        logins = sum(await asyncio.gather(*flood))
+
+    print(f"logins: {logins} ({logins / args.duration:.1f}/s), /me samples: {len(latencies)}")
+    print(
+        f"/me latency ms: p50={statistics.median(latencies):.1f} "
+        f"p95={percentile(latencies, 95):.1f} p99={percentile(latencies, 99):.1f} "
+        f"max={max(latencies):.1f}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", default="user1@example.com")
+    parser.add_argument("--password", default="password123")
+    parser.add_argument("--flood", type=int, default=50, help="параллельных логинов")
+    parser.add_argument("--duration", type=float, default=15.0, help="секунд")
+    parser.add_argument("--interval", type=float, default=0.01, help="пауза между запросами /me")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,64 @@
+"""Проверка режима POSTGRES_POOL_MODE=external за PgBouncer (transaction mode).
+
+Поднять PgBouncer из docker-compose и направить приложение на него:
+
+    docker compose --profile pgbouncer up -d
+    POSTGRES_POOL_MODE=external POSTGRES_HOST_PORT=6432 \
+        uv run python benchmarks/pgbouncer_check.py --workers 200 --rounds 20
+
+Много конкурентных сессий гоняют одинаковые параметризованные запросы:
+в transaction mode серверные соединения делятся между клиентами, и при
+именованных/кэшированных prepared statements asyncpg падает с
+"prepared statement ... already exists" / "does not exist".
+С режимом internal против PgBouncer скрипт эти ошибки воспроизводит.
+"""
+import argparse
+import asyncio
+import collections
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select, func  # noqa: E402
+
+from src.Models.User import User  # noqa: E402
+from src.config.core import engine, local_session  # noqa: E402
+from src.config.settings import get_settings  # noqa: E402
+
+
+async def worker(rounds: int, errors: collections.Counter) -> int:
+    done = 0
+    for i in range(rounds):
+        try:
+            async with local_session() as session:
+                await session.execute(select(User).where(User.id == i + 1))
+                await session.execute(select(func.count()).select_from(User).where(User.is_active.is_(True)))
+                await session.rollback()
+            done += 1
+        except Exception as e:
+            errors[f"{type(e).__name__}: {str(e).splitlines()[0][:120]}"] += 1
+    return done
+
+
+async def main(workers: int, rounds: int) -> int:
+    print(f"pool mode: {get_settings().database.postgres_pool_mode}, pool: {type(engine.sync_engine.pool).__name__}")
+    errors: collections.Counter = collections.Counter()
+    started = time.perf_counter()
+    done = sum(await asyncio.gather(*(worker(rounds, errors) for _ in range(workers))))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    print(f"sessions ok: {done}/{workers * rounds}, {done / elapsed:.0f} sessions/s")
+    for error, count in errors.most_common():
+        print(f"  {count:6d}  {error}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.workers, args.rounds)))
@@ -0,0 +1,80 @@
+"""Ротация refresh токена: задержка и гонка параллельных refresh с одной cookie.
+
+Запускать против работающего сервиса:
+
+    uv run python benchmarks/refresh_rotation.py --refreshes 500 --rounds 50 --clients 10
+
+Регистрирует пользователя, затем:
+- делает --refreshes последовательных refresh (каждый новым токеном) и печатает p50/p99;
+- --rounds раз отправляет --clients одновременных refresh с одним и тем же токеном.
+  В каждом раунде должен пройти ровно один (200), остальные — 401. До ротации
+  одним Lua-скриптом (GET, DELETE, SET отдельными запросами) несколько
+  параллельных запросов успевали прочитать токен и получали каждый свою сессию.
+"""
+import argparse
+import asyncio
+import collections
+import time
+import uuid
+
+import httpx
+
+
+def cookie(token: str) -> dict:
+    # cookie выставляется с secure=True, по http клиент сам её не отправит
+    return {"Cookie": f"refresh_token={token}"}
+
+
+async def refresh(client: httpx.AsyncClient, token: str) -> httpx.Response:
+    return await client.post("/v1/auth/refresh", headers=cookie(token))
+
+
+async def main(base_url: str, refreshes: int, rounds: int, clients: int) -> None:
+    limits = httpx.Limits(max_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        response = await client.post("/v1/auth/register", json={
+            "first_name": "Bench",
+            "last_name": "User",
+            "email": f"bench-refresh-{uuid.uuid4().hex[:8]}@example.com",
+            "password": "benchmark-password",
+            "password2": "benchmark-password",
+        })
+        response.raise_for_status()
+        token = response.cookies["refresh_token"]
+
+        latencies = []
+        for _ in range(refreshes):
+            started = time.perf_counter()
+            response = await refresh(client, token)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+            token = response.cookies["refresh_token"]
+        latencies.sort()
+        print(f"sequential: {refreshes} refreshes, p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms")
+
+        statuses = collections.Counter()
+        broken_rounds = 0
+        for _ in range(rounds):
+            responses = await asyncio.gather(*(refresh(client, token) for _ in range(clients)))
+            codes = [r.status_code for r in responses]
+            statuses.update(codes)
+            winners = [r for r in responses if r.status_code == 200]
+            broken_rounds += len(winners) != 1
+            if not winners:
+                break
+            token = winners[0].cookies["refresh_token"]
+        print(f"concurrent: {rounds} rounds x {clients} clients, statuses {dict(sorted(statuses.items()))}")
+        if broken_rounds or set(statuses) - {200, 401}:
+            print(f"FAIL: {broken_rounds} rounds without exactly one 200")
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--refreshes", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--clients", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.refreshes, args.rounds, args.clients))
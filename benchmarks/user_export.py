@@ -0,0 +1,60 @@
+"""Пропускная способность и память потоковой выгрузки пользователей.
+
+Гоняет тот же генератор, что и GET /v1/admin/users/export, без HTTP:
+
+    uv run python benchmarks/user_export.py --format ndjson
+    uv run python benchmarks/user_export.py --format csv --search bench-0
+
+Каждые --report строк печатается скорость и пиковый RSS процесса: при выгрузке
+через серверный курсор пик не растёт вместе с числом строк.
+"""
+import argparse
+import asyncio
+import resource
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.config.core import engine  # noqa: E402
+from src.schemes.pagination_filter import PaginationFilter  # noqa: E402
+from src.services.user_export import export_users  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss в Linux — килобайты
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def main(fmt: str, search: str | None, report: int) -> None:
+    filter_params = PaginationFilter(
+        page=None, size=None, order_by="id", order_by_direction="desc",
+        extra={"email": None, "search": search, "search_mode": "prefix"},
+    )
+    rows = 0
+    size = 0
+    next_report = report
+    started = time.perf_counter()
+    async for chunk in export_users(filter_params, fmt):
+        rows += chunk.count("\n")
+        size += len(chunk)
+        if rows >= next_report:
+            elapsed = time.perf_counter() - started
+            print(f"{rows:>10} rows  {rows / elapsed:>9.0f} rows/s  peak rss {peak_rss_mb():7.1f} MB")
+            next_report += report
+    elapsed = time.perf_counter() - started
+    if fmt == "csv":
+        rows -= 1
+    print(f"total: {rows} rows, {size / 1024 / 1024:.1f} MB in {elapsed:.1f}s "
+          f"({rows / elapsed:.0f} rows/s), peak rss {peak_rss_mb():.1f} MB")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--search", default=None, help="фильтр по началу email")
+    parser.add_argument("--report", type=int, default=200000)
+    args = parser.parse_args()
+    asyncio.run(main(args.format, args.search, args.report))
@@ -0,0 +1,85 @@
+"""Проверка, что каждая разрешённая сортировка и фильтр списка пользователей идут по индексу.
+
+Индексы создаёт миграция c7a3e5d91f24 (alembic upgrade head), таблицу удобно
+засеять benchmarks/admin_pagination.py --seed 3000000:
+
+    uv run python benchmarks/user_indexes.py
+    uv run python benchmarks/user_indexes.py --offset 100000 --direction asc
+
+Для каждой пары (order_by из User.sortable, фильтр) строятся те же запросы,
+что и в GET /v1/admin/users (страница offset и keyset-страница после первой),
+и печатается время EXPLAIN ANALYZE и узлы плана. Запрос без индексного узла
+в плане помечается NO INDEX, а скрипт завершается с кодом 1.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.dialects import postgresql  # noqa: E402
+
+from src.Models.User import User  # noqa: E402
+from src.config.core import engine, local_session  # noqa: E402
+from src.schemes.pagination_filter import PaginationFilter  # noqa: E402
+
+FILTERS = {
+    "-": {},
+    "inactive": {"is_active": False},
+    "active": {"is_active": True},
+    "admins": {"role": "admin"},
+    "users": {"role": "user"},
+}
+INDEX_NODES = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+
+def plan_nodes(plan: dict) -> list[str]:
+    node = plan["Node Type"]
+    if "Index Name" in plan:
+        node += f" ({plan['Index Name']})"
+    nodes = [node]
+    for child in plan.get("Plans", []):
+        nodes += plan_nodes(child)
+    return nodes
+
+
+async def explain(session, statement) -> tuple[float, list[str]]:
+    sql = statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    raw = await session.scalar(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"))
+    result = json.loads(raw) if isinstance(raw, str) else raw
+    return result[0]["Execution Time"], plan_nodes(result[0]["Plan"])
+
+
+async def main(direction: str, size: int, offset: int) -> int:
+    failed = 0
+    async with local_session() as session:
+        for order_by in User.sortable:
+            for name, extra in FILTERS.items():
+                filter_params = PaginationFilter(
+                    page=None, size=size, order_by=order_by, order_by_direction=direction,
+                    extra={"email": None, **extra},
+                )
+                statement = User.get_filter_statement(filter_params).offset(offset)
+                first = (await session.scalars(User.get_keyset_statement(filter_params).limit(1))).first()
+                after = (getattr(first, order_by), first.id) if first is not None else None
+                queries = (("offset", statement), ("keyset", User.get_keyset_statement(filter_params, after)))
+                for mode, query in queries:
+                    elapsed, nodes = await explain(session, query)
+                    indexed = any(node.startswith(INDEX_NODES) for node in nodes)
+                    failed += not indexed
+                    mark = "ok" if indexed else "NO INDEX"
+                    print(f"{order_by:10s} {name:8s} {mode:6s} {elapsed:9.2f} ms  {mark:8s} {' -> '.join(nodes)}")
+    await engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--direction", choices=("desc", "asc"), default="desc")
+    parser.add_argument("--size", type=int, default=50)
+    parser.add_argument("--offset", type=int, default=0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.direction, args.size, args.offset)))
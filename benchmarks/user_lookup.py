@@ -0,0 +1,78 @@
+"""ORM vs Core fast path для поиска пользователя (find_by_id / find_one_or_none по email).
+
+Запускать против засеянной базы (seed_db.py), кэш не используется:
+
+    uv run python benchmarks/user_lookup.py --iterations 5000
+
+ORM: select(User) -> identity map -> User -> UserResponse.
+Fast: готовый Core-запрос -> UserRecord (__slots__) -> UserResponse.
+Кроме времени на операцию считается CPU процесса на операцию (без ожидания БД).
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import select  # noqa: E402
+
+from src.Models.User import User  # noqa: E402
+from src.config.core import engine, local_session, release_if_read_only  # noqa: E402
+from src.repositories.user_repository import UserRepository  # noqa: E402
+from src.schemes.schemes import UserResponse  # noqa: E402
+
+
+async def orm_by_id(session, user_id: int):
+    user = await session.scalar(select(User).where(User.id == user_id))
+    await release_if_read_only(session)
+    return UserResponse.model_validate(user)
+
+
+async def orm_by_email(session, email: str):
+    user = await session.scalar(select(User).filter_by(email=email))
+    await release_if_read_only(session)
+    return UserResponse.model_validate(user)
+
+
+async def fast_by_id(session, user_id: int):
+    return UserResponse.model_validate(await UserRepository(session).find_by_id(user_id))
+
+
+async def fast_by_email(session, email: str):
+    return UserResponse.model_validate(await UserRepository(session).find_one_or_none({"email": email}))
+
+
+async def measure(name: str, func, arg, iterations: int) -> None:
+    async with local_session() as session:
+        for _ in range(100):
+            await func(session, arg)
+
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        for _ in range(iterations):
+            await func(session, arg)
+        cpu = time.process_time() - cpu_started
+        elapsed = time.perf_counter() - started
+    print(f"{name:14s} {elapsed / iterations * 1e6:8.1f} us/op   cpu {cpu / iterations * 1e6:8.1f} us/op")
+
+
+async def main(iterations: int) -> None:
+    async with local_session() as session:
+        user = await session.scalar(select(User).order_by(User.id).limit(1))
+    if user is None:
+        raise SystemExit("База пуста — сначала seed_db.py")
+
+    await measure("orm by id", orm_by_id, user.id, iterations)
+    await measure("fast by id", fast_by_id, user.id, iterations)
+    await measure("orm by email", orm_by_email, user.email, iterations)
+    await measure("fast by email", fast_by_email, user.email, iterations)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
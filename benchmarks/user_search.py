@@ -0,0 +1,81 @@
+"""Поиск пользователей по началу email и подстроке на большой таблице.
+
+Таблицу удобно засеять benchmarks/admin_pagination.py --seed 3000000,
+индексы — миграцией b41d7c2e9a10 (alembic upgrade head):
+
+    uv run python benchmarks/user_search.py --search bench-00 --search admin --contains user12
+
+Для каждого запроса (тот же get_cond_list, что и в API) печатается время
+выполнения и использованные индексы из EXPLAIN ANALYZE: prefix должен идти по
+ix_users_email_lower_pattern, contains — Bitmap Index Scan по *_trgm. Запрос
+без индексного узла в плане помечается NO INDEX, а скрипт завершается с кодом 1.
+
+PostgreSQL 18 с pg_trgm, 1M пользователей: выражения lower(поле) LIKE совпадают
+с выражениями индексов, prefix — Index Scan / Bitmap Index Scan по
+ix_users_email_lower_pattern (0.5–43 ms), contains — BitmapOr из трёх *_trgm
+(13–27 ms); без индексов те же count — 400–740 ms (Parallel Seq Scan).
+Частая подстрока со страницей (LIMIT) может идти по users_pkey в порядке id.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text, select, func  # noqa: E402
+from sqlalchemy.dialects import postgresql  # noqa: E402
+
+from src.Models.User import User  # noqa: E402
+from src.config.core import engine, local_session  # noqa: E402
+
+
+INDEX_NODES = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+
+def plan_nodes(plan: dict) -> list[str]:
+    node = plan["Node Type"]
+    if "Index Name" in plan:
+        node += f" ({plan['Index Name']})"
+    nodes = [node]
+    for child in plan.get("Plans", []):
+        nodes += plan_nodes(child)
+    return nodes
+
+
+async def explain(session, search: str, mode: str, size: int) -> int:
+    conditions = User.get_cond_list(email=None, search=search, search_mode=mode)
+    statement = select(User).where(*conditions).order_by(User.id.desc()).limit(size)
+    count_statement = select(func.count()).select_from(User).where(*conditions)
+    failed = 0
+    for name, query in (("page", statement), ("count", count_statement)):
+        sql = query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+        raw = await session.scalar(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}"))
+        result = json.loads(raw) if isinstance(raw, str) else raw
+        nodes = plan_nodes(result[0]["Plan"])
+        indexed = any(node.startswith(INDEX_NODES) for node in nodes)
+        failed += not indexed
+        mark = "ok" if indexed else "NO INDEX"
+        print(f"{mode:8s} {search!r:14s} {name:5s} {result[0]['Execution Time']:9.2f} ms  {mark:8s} {' -> '.join(nodes)}")
+    return failed
+
+
+async def main(prefixes: list[str], substrings: list[str], size: int) -> int:
+    failed = 0
+    async with local_session() as session:
+        for search in prefixes:
+            failed += await explain(session, search, "prefix", size)
+        for search in substrings:
+            failed += await explain(session, search, "contains", size)
+    await engine.dispose()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--search", action="append", default=[], help="поиск по началу email")
+    parser.add_argument("--contains", action="append", default=[], help="поиск подстроки")
+    parser.add_argument("--size", type=int, default=50)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.search or ["admin"], args.contains or ["example"], args.size)))
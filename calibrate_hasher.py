@@ -0,0 +1,42 @@
+import argparse
+import statistics
+import time
+
+from src.security.hashers import HASHERS, PasswordHasher
+
+
+def measure_verify_ms(hasher: PasswordHasher, samples: int) -> float:
+    """Медианное время проверки пароля в миллисекундах"""
+    hashed = hasher.hash("calibration-password")
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.verify("calibration-password", hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate(scheme: str, target_ms: float, samples: int) -> int:
+    """Подобрать максимальную стоимость, при которой verify укладывается в target_ms"""
+    hasher_cls = HASHERS[scheme]
+    chosen = hasher_cls.min_cost
+    for cost in range(hasher_cls.min_cost, hasher_cls.max_cost + 1):
+        elapsed = measure_verify_ms(hasher_cls(cost), samples)
+        print(f"{scheme} cost={cost}: {elapsed:.1f} ms")
+        if elapsed > target_ms:
+            break
+        chosen = cost
+    return chosen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Подбор стоимости хэширования паролей под текущую машину")
+    parser.add_argument("--scheme", choices=sorted(HASHERS), default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=50.0, help="целевое время проверки пароля")
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+
+    cost = calibrate(args.scheme, args.target_ms, args.samples)
+    print()
+    print(f"PASSWORD_SCHEME={args.scheme}")
+    print(f"PASSWORD_HASH_COST={cost}")
@@ -0,0 +1,251 @@
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
+import asyncpg
+
+from src.cache.count_cache import CountCache
+from src.clients.redis import RedisClient
+from src.config.settings import get_settings
+from src.security.hashers import PasswordHasher
+from src.security.jwt_service import get_password_hashers
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("email", "first_name", "last_name", "hash_password", "is_active", "role")
+ROLES = ("admin", "user")
+# String(50) в модели User
+NAME_MAX_LENGTH = 50
+
+CREATE_STAGE = """
+CREATE TEMP TABLE import_users (
+    email varchar NOT NULL,
+    first_name varchar(50) NOT NULL,
+    last_name varchar(50) NOT NULL,
+    hash_password varchar NOT NULL,
+    is_active boolean NOT NULL,
+    role varchar(20) NOT NULL
+) ON COMMIT DELETE ROWS
+"""
+
+# дубликаты (уже существующие email и повторы внутри файла) пропускаются,
+# поэтому повторный прогон батча после сбоя безопасен
+MERGE_STAGE = f"""
+INSERT INTO users ({", ".join(COLUMNS)})
+SELECT {", ".join(COLUMNS)} FROM import_users
+ON CONFLICT (email) DO NOTHING
+"""
+
+
+def read_records(path: Path, fmt: str) -> Iterator[dict]:
+    """Записи из CSV (с заголовком) или NDJSON"""
+    with path.open(encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _parse_bool(value) -> bool:
+    if value is None or value == "":
+        return True
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "t")
+
+
+def _valid_fields(record: dict) -> bool:
+    """email и имя заданы, имя влезает в колонку, роль известна"""
+    if not record.get("email"):
+        return False
+    for field in ("first_name", "last_name"):
+        if not record.get(field) or len(record[field]) > NAME_MAX_LENGTH:
+            return False
+    return (record.get("role") or "user") in ROLES
+
+
+def _hash_chunk(hasher: PasswordHasher, passwords: list[str]) -> list[str]:
+    return [hasher.hash(password) for password in passwords]
+
+
+class Importer:
+    """Загрузка пользователей батчами через COPY во временную таблицу.
+
+    Пароли в открытом виде хэшируются в пуле процессов схемой по умолчанию,
+    готовые хэши (поле hash_password) принимаются, если схема известна.
+    После каждого закоммиченного батча номер строки пишется в checkpoint.
+    """
+
+    def __init__(self, path: Path, fmt: str, batch_size: int, workers: int, checkpoint: Path):
+        self.path = path
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.workers = workers
+        self.checkpoint = checkpoint
+        self.hashers = get_password_hashers()
+
+        self.rows_done = 0
+        self.start_row = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+
+    def _load_checkpoint(self) -> int:
+        if not self.checkpoint.exists():
+            return 0
+        state = json.loads(self.checkpoint.read_text())
+        if state.get("input") != str(self.path.resolve()):
+            raise SystemExit(f"Checkpoint {self.checkpoint} относится к другому файлу: {state.get('input')}")
+        return state["rows_done"]
+
+    def _save_checkpoint(self) -> None:
+        tmp = self.checkpoint.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"input": str(self.path.resolve()), "rows_done": self.rows_done}))
+        os.replace(tmp, self.checkpoint)
+
+    def _prepare(self, records: list[dict]) -> tuple[list[dict], list[str]]:
+        """Отобрать валидные записи и пароли, которые нужно захэшировать"""
+        valid, passwords = [], []
+        for record in records:
+            if not _valid_fields(record):
+                self.invalid += 1
+                continue
+            hashed = record.get("hash_password")
+            if hashed:
+                if self.hashers.identify(hashed) is None:
+                    self.invalid += 1
+                    continue
+            elif record.get("password"):
+                passwords.append(record["password"])
+            else:
+                self.invalid += 1
+                continue
+            valid.append(record)
+        return valid, passwords
+
+    async def _hash(self, executor: ProcessPoolExecutor, passwords: list[str]) -> list[str]:
+        if not passwords:
+            return []
+        loop = asyncio.get_running_loop()
+        chunk = max(1, len(passwords) // (self.workers * 4))
+        futures = [
+            loop.run_in_executor(executor, _hash_chunk, self.hashers.default, passwords[i:i + chunk])
+            for i in range(0, len(passwords), chunk)
+        ]
+        return list(itertools.chain.from_iterable(await asyncio.gather(*futures)))
+
+    @staticmethod
+    def _rows(records: list[dict], hashes: list[str]) -> list[tuple]:
+        new_hashes = iter(hashes)
+        return [
+            (
+                record["email"],
+                record["first_name"],
+                record["last_name"],
+                record.get("hash_password") or next(new_hashes),
+                _parse_bool(record.get("is_active")),
+                record.get("role") or "user",
+            )
+            for record in records
+        ]
+
+    async def _copy_batch(self, connection: asyncpg.Connection, rows: list[tuple]) -> int:
+        async with connection.transaction():
+            await connection.copy_records_to_table("import_users", records=rows, columns=COLUMNS)
+            status = await connection.execute(MERGE_STAGE)
+        return int(status.split()[-1])
+
+    async def run(self) -> None:
+        settings = get_settings().database
+        dsn = settings.get_database.replace("postgresql+asyncpg://", "postgresql://", 1)
+        # за PgBouncer (transaction mode) именованные prepared statements недоступны
+        statement_cache_size = 0 if settings.postgres_pool_mode == "external" else 100
+        connection = await asyncpg.connect(dsn, statement_cache_size=statement_cache_size)
+
+        skip = self._load_checkpoint()
+        if skip:
+            logger.info(f"Продолжаю с записи {skip}")
+        self.rows_done = self.start_row = skip
+        records = itertools.islice(read_records(self.path, self.fmt), skip, None)
+
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        started = time.perf_counter()
+        try:
+            await connection.execute(CREATE_STAGE)
+            pending: asyncio.Task | None = None
+            while True:
+                batch = list(itertools.islice(records, self.batch_size))
+                if not batch:
+                    break
+                valid, passwords = self._prepare(batch)
+                # следующий батч хэшируется, пока текущий загружается через COPY
+                hashing = asyncio.create_task(self._hash(executor, passwords))
+                if pending is not None:
+                    await pending
+                hashes = await hashing
+                pending = asyncio.create_task(self._commit(connection, self._rows(valid, hashes), len(batch), started))
+            if pending is not None:
+                await pending
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            await connection.close()
+            if self.inserted:
+                await self._invalidate_counts()
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Готово: обработано {self.rows_done - skip} записей за {elapsed:.1f}s, "
+            f"добавлено {self.inserted}, дубликатов {self.duplicates}, невалидных {self.invalid}"
+        )
+        self.checkpoint.unlink(missing_ok=True)
+
+    @staticmethod
+    async def _invalidate_counts() -> None:
+        """Закэшированные total списков пользователей (CountCache) устаревают после вставки"""
+        try:
+            await RedisClient.init_pool()
+            await CountCache(RedisClient.get_client(), get_settings().redis_config.count_cache_ttl).invalidate("users")
+        except Exception as e:
+            logger.error(f"Не удалось сбросить кэш COUNT(*) пользователей, он устареет по TTL: {e}")
+        finally:
+            await RedisClient.close_pool()
+
+    async def _commit(self, connection: asyncpg.Connection, rows: list[tuple], batch_len: int, started: float) -> None:
+        inserted = await self._copy_batch(connection, rows) if rows else 0
+        self.inserted += inserted
+        self.duplicates += len(rows) - inserted
+        self.rows_done += batch_len
+        self._save_checkpoint()
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"{self.rows_done} записей, добавлено {self.inserted}, дубликатов {self.duplicates}, "
+            f"невалидных {self.invalid}, {(self.rows_done - self.start_row) / elapsed:.0f} rows/s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Массовый импорт пользователей из CSV/NDJSON")
+    parser.add_argument("path", type=Path, help="файл с полями email, first_name, last_name, "
+                                                "password или hash_password, [role], [is_active]")
+    parser.add_argument("--format", choices=("csv", "ndjson"), help="по умолчанию — по расширению файла")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="процессов для хэширования")
+    parser.add_argument("--checkpoint", type=Path, help="по умолчанию <path>.checkpoint")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.suffix.lower() == ".csv" else "ndjson")
+    checkpoint = args.checkpoint or args.path.with_name(args.path.name + ".checkpoint")
+    importer = Importer(args.path, fmt, args.batch_size, args.workers, checkpoint)
+    asyncio.run(importer.run())
@@ -4,8 +4,11 @@ from fastapi import FastAPI, HTTPException
 from fastapi.exceptions import RequestValidationError
 from fastapi_pagination import add_pagination
 
-from src.api import router
+from src.api import router, well_known_router
+from src.cache.invalidation import CacheInvalidator
 from src.clients.redis import RedisClient
+from src.security.hashing_executor import HashingExecutor
+from src.security.jwt_service import get_token_codec, get_password_hashers
 from src.exceptions.handlers import ErrorHandlerMiddleware, validation_exception_handler, http_exception_handler
 from src.config.settings import get_settings
 
@@ -15,8 +18,15 @@ get_settings().logging.setup()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # ошибки конфигурации (нет ключей, нет argon2-cffi) — при старте, а не на первом запросе
+    get_token_codec()
+    get_password_hashers()
     await RedisClient.init_pool()
+    await CacheInvalidator.start()
+    HashingExecutor.init_pool()
     yield
+    HashingExecutor.close_pool()
+    await CacheInvalidator.stop()
     await RedisClient.close_pool()
 
 app = FastAPI(title="Auth-Service", lifespan=lifespan)
@@ -33,5 +43,6 @@ app.add_middleware(ErrorHandlerMiddleware)
 
 
 app.include_router(router)
+app.include_router(well_known_router)
 
 add_pagination(app)
\ No newline at end of file
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 
 from src.config.settings import get_settings
 from src.Models.User import User
+from src.security.hashing_executor import HashingExecutor
 from src.security.jwt_service import JwtService
 
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +22,7 @@ async def seed_users():
     async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
     
     jwt_service = JwtService()
+    HashingExecutor.init_pool()
     
     try:
         async with async_session() as session:
@@ -66,10 +68,13 @@ async def seed_users():
             ]
             
             all_users = admins + users
+
+            # хэши считаются параллельно в пуле воркеров
+            hashes = await asyncio.gather(
+                *(jwt_service.hash_password("password123") for _ in all_users)
+            )
             
-            for user_data in all_users:
-                hash_password = await jwt_service.hash_password("password123")
-                
+            for user_data, hash_password in zip(all_users, hashes):
                 user = User(
                     email=user_data["email"],
                     first_name=user_data["first_name"],
@@ -88,6 +93,9 @@ async def seed_users():
     except Exception as e:
         logger.error(f"Ошибка при вставке данных: {e}")
     finally:
+        HashingExecutor.close_pool()
         await engine.dispose()
 
 
+if __name__ == "__main__":
+    asyncio.run(seed_users())
@@ -1,12 +1,14 @@
 ﻿from datetime import datetime
 
-from sqlalchemy import String, func
+from sqlalchemy import String, func, or_, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from src.Models.base import Base
 
 
 class User(Base):
     __tablename__ = 'users'
+    # у каждого поля сортировки есть индекс (поле, id), см. ниже
+    sortable = ("id", "email", "created_at", "last_name", "role")
 
     id: Mapped[int] = mapped_column(primary_key=True)
     email: Mapped[str] = mapped_column(unique=True, index=True, nullable=False)
@@ -27,4 +29,61 @@ class User(Base):
         if kwargs['email']:
             cond_list.append(User.email == kwargs['email'])
 
+        # NOT is_active и role = 'admin' — под частичные индексы
+        if kwargs.get('is_active') is not None:
+            cond_list.append(User.is_active if kwargs['is_active'] else ~User.is_active)
+        if kwargs.get('role'):
+            cond_list.append(User.role == kwargs['role'])
+
+        # поиск: lower(поле) LIKE — под функциональные индексы (см. ниже)
+        if kwargs.get('search'):
+            pattern = escape_like(kwargs['search'].lower())
+            if kwargs.get('search_mode') == 'contains':
+                pattern = f"%{pattern}%"
+                fields = (User.email, User.first_name, User.last_name)
+            else:
+                pattern = f"{pattern}%"
+                fields = (User.email,)
+            cond_list.append(or_(*(func.lower(field).like(pattern) for field in fields)))
+
         return cond_list
+
+
+def escape_like(value: str) -> str:
+    """Экранировать спецсимволы LIKE (экранирующий символ по умолчанию — обратный слэш)"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# prefix-поиск по email: btree по lower(email) с text_pattern_ops
+Index(
+    "ix_users_email_lower_pattern",
+    func.lower(User.email).label("lower_email"),
+    postgresql_ops={"lower_email": "text_pattern_ops"},
+)
+# подстрока по email и имени: триграммные GIN индексы (расширение pg_trgm)
+Index(
+    "ix_users_email_trgm",
+    func.lower(User.email).label("lower_email"),
+    postgresql_using="gin",
+    postgresql_ops={"lower_email": "gin_trgm_ops"},
+)
+Index(
+    "ix_users_first_name_trgm",
+    func.lower(User.first_name).label("lower_first_name"),
+    postgresql_using="gin",
+    postgresql_ops={"lower_first_name": "gin_trgm_ops"},
+)
+Index(
+    "ix_users_last_name_trgm",
+    func.lower(User.last_name).label("lower_last_name"),
+    postgresql_using="gin",
+    postgresql_ops={"lower_last_name": "gin_trgm_ops"},
+)
+# сортировка по полю с id как tie-breaker (ORDER BY поле, id и keyset (поле, id) > (...))
+Index("ix_users_email_id", User.email, User.id)
+Index("ix_users_created_at_id", User.created_at, User.id)
+Index("ix_users_last_name_id", User.last_name, User.id)
+Index("ix_users_role_id", User.role, User.id)
+# редкие значения горячих фильтров: деактивированные пользователи и админы
+Index("ix_users_inactive_id", User.id, postgresql_where=~User.is_active)
+Index("ix_users_admin_id", User.id, postgresql_where=User.role == "admin")
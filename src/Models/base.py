@@ -1,8 +1,12 @@
-﻿from sqlalchemy import select, Select
+﻿from typing import Any, ClassVar
+
+from sqlalchemy import select, Select, tuple_
 from sqlalchemy.orm import DeclarativeBase
 
 
 class Base(DeclarativeBase):
+    # поля, по которым разрешена сортировка и keyset-пагинация (NOT NULL, + id как tie-breaker)
+    sortable: ClassVar[tuple[str, ...]] = ("id",)
 
     @classmethod
     def get_filter_statement(cls, kwargs) -> Select:
@@ -10,11 +14,15 @@ class Base(DeclarativeBase):
         statement = select(cls)
         # Сортировка
         if kwargs.order_by:
+            if kwargs.order_by not in cls.sortable:
+                raise ValueError(f"order_by must be one of: {', '.join(cls.sortable)}")
             field = getattr(cls, kwargs.order_by)
+            # id — tie-breaker: порядок стабилен между страницами и совпадает с индексом (поле, id)
+            fields = (field,) if kwargs.order_by == "id" else (field, cls.id)
             if kwargs.order_by_direction == "desc":
-                statement = statement.order_by(field.desc())
+                statement = statement.order_by(*(f.desc() for f in fields))
             else:
-                statement = statement.order_by(field.asc())
+                statement = statement.order_by(*(f.asc() for f in fields))
         # Фильтры
 
         if kwargs.extra:
@@ -28,3 +36,29 @@ class Base(DeclarativeBase):
         if kwargs.size is not None:
             statement = statement.limit(kwargs.size)
         return statement
+
+    @classmethod
+    def get_keyset_statement(cls, kwargs, after: tuple[Any, int] | None = None) -> Select:
+        """SQL запрос для keyset-пагинации: WHERE (поле, id) после курсора, без OFFSET.
+
+        Берётся size + 1 строка — лишняя строка означает, что есть следующая страница.
+        """
+        statement = select(cls)
+        field = getattr(cls, kwargs.order_by)
+        descending = kwargs.order_by_direction == "desc"
+        if kwargs.extra:
+            cond_list = cls.get_cond_list(**kwargs.extra)
+            if cond_list:
+                statement = statement.where(*cond_list)
+        if after is not None:
+            value, _id = after
+            if kwargs.order_by == "id":
+                key, bound = cls.id, _id
+            else:
+                key, bound = tuple_(field, cls.id), tuple_(value, _id)
+            statement = statement.where(key < bound if descending else key > bound)
+        if descending:
+            statement = statement.order_by(field.desc(), cls.id.desc())
+        else:
+            statement = statement.order_by(field.asc(), cls.id.asc())
+        return statement.limit(kwargs.size + 1)
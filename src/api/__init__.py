@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 from .auth import router as auth_router
 from .admin import router as admin_router
+from .well_known import router as well_known_router
 from ..di.dependencies import require_admin
 
 router= APIRouter(prefix="/v1")
@@ -1,36 +1,102 @@
 ﻿from typing import Literal
-from fastapi import Depends, Query, APIRouter
-from fastapi_pagination import Page
+from fastapi import Depends, Query, APIRouter, Request
+from fastapi.responses import StreamingResponse
+from fastapi_pagination import pagination_ctx
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.di.dependencies import get_session, get_admin_service
+from src.Models.User import User
+from src.cache.count_cache import CountCache
+from src.cache.invalidation import CacheInvalidator
+from src.cache.user_cache import UserCache
+from src.config.core import engine, replica_engine, is_sticky
+from src.config.pool import pool_stats
+from src.di.dependencies import SessionDepends, get_admin_service, get_count_cache, get_current_user
+from src.exceptions.custom_exceptions import RequestValidationException
+from src.schemes.counting import CountMode, CountedPage
+from src.schemes.cursor import CursorPage
 from src.schemes.pagination_filter import PaginationFilter
-from src.schemes.schemes import UserSchema as UserSchema, UserResponse
+from src.schemes.schemes import UserSchema as UserSchema, UserResponse, BulkUserAction, BulkActionResult
+from src.security.admission import get_password_admission
+from src.security.current_user import CurrentUser
+from src.security.hashing_executor import HashingExecutor
+from src.security.jwt_service import get_token_cache
 from src.services.admin_service import AdminService
+from src.services.user_export import ExportFormat, MEDIA_TYPES, export_users
 
 router = APIRouter(tags=["Admins"], prefix="/admin")
 
+SEARCH_CONTAINS_MIN_LENGTH = 3
 
-@router.get("/users", response_model=Page[UserSchema])
-async def get_all_users(
-        order_by: str = Query("id"),
+
+def user_filter(
+        order_by: str = Query("id", description=f"Поле для сортировки: {', '.join(User.sortable)}"),
         direction: Literal["desc", "asc"] = Query("desc", description="Направление сортировки"),
-        size: int = Query(default=None, description="Кол-во объектов"),
-        page: int = Query(default=None, description='Номер страницы'),
         email: str = Query(default=None, description="Поиск по email"),
-        session: AsyncSession = Depends(get_session),
-):
-    """Получить список всех пользователей (доступно только для админов)"""
-    filter_params = PaginationFilter(
+        search: str = Query(default=None, min_length=1, max_length=100, description="Поиск по началу email или подстроке"),
+        search_mode: Literal["prefix", "contains"] = Query(
+            "prefix", description="prefix — начало email, contains — подстрока в email/имени/фамилии (от 3 символов)"
+        ),
+        is_active: bool = Query(default=None, description="Только активные / деактивированные"),
+        role: Literal["admin", "user"] = Query(default=None, description="Фильтр по роли"),
+) -> PaginationFilter:
+    """Фильтры и сортировка списка пользователей (общие для списка и экспорта)"""
+    # сортировка только по полям с индексом, иначе — полная сортировка таблицы
+    if order_by not in User.sortable:
+        raise RequestValidationException(detail=f"order_by must be one of: {', '.join(User.sortable)}")
+    # триграммный индекс помогает только от 3 символов, короче — полный скан
+    if search and search_mode == "contains" and len(search) < SEARCH_CONTAINS_MIN_LENGTH:
+        raise RequestValidationException(
+            detail=f"search_mode=contains needs at least {SEARCH_CONTAINS_MIN_LENGTH} characters"
+        )
+    return PaginationFilter(
         order_by=order_by,
         order_by_direction=direction,
-        size=size,
-        page=page,
+        size=None,
+        page=None,
         extra={
-            "email": email
+            "email": email,
+            "search": search,
+            "search_mode": search_mode,
+            "is_active": is_active,
+            "role": role,
         }
     )
-    return await UserSchema.paginate(session, filter_params)
+
+
+@router.get(
+    "/users",
+    response_model=CountedPage[UserSchema] | CursorPage[UserSchema],
+    dependencies=[Depends(pagination_ctx(CountedPage[UserSchema]))],
+)
+async def get_all_users(
+        filter_params: PaginationFilter = Depends(user_filter),
+        size: int = Query(default=None, description="Кол-во объектов"),
+        page: int = Query(default=None, description='Номер страницы'),
+        paging: Literal["offset", "cursor"] = Query("offset", description="offset — page/total, cursor — keyset"),
+        cursor: str = Query(default=None, description="next_cursor предыдущей страницы (включает режим cursor)"),
+        count: CountMode = Query(default=None, description="Как считать total: exact / estimated / cached / none"),
+        session: AsyncSession = SessionDepends,
+        counts: CountCache = Depends(get_count_cache),
+):
+    """Получить список всех пользователей (доступно только для админов)"""
+    filter_params = filter_params._replace(size=size, page=page)
+    if paging == "cursor" or cursor:
+        return await UserSchema.cursor_paginate(session, filter_params, cursor)
+    return await UserSchema.paginate(session, filter_params, count, counts)
+
+
+@router.get("/users/export")
+async def export_all_users(
+        request: Request,
+        filter_params: PaginationFilter = Depends(user_filter),
+        export_format: ExportFormat = Query("ndjson", alias="format", description="ndjson или csv"),
+):
+    """Выгрузить всех пользователей по фильтру потоком (NDJSON / CSV)"""
+    return StreamingResponse(
+        export_users(filter_params, export_format, use_replica=not is_sticky(request.cookies)),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="users.{export_format}"'},
+    )
 
 
 @router.put("/{user_id}/role", response_model=UserResponse)
@@ -41,3 +107,28 @@ async def change_user_role(
 ):
     """Смена роли админом"""
     return await admin_service.updating_role(user_id, role)
+
+
+@router.post("/users/bulk", response_model=BulkActionResult)
+async def bulk_user_action(
+        data: BulkUserAction,
+        current_user: CurrentUser = Depends(get_current_user),
+        admin_service: AdminService = Depends(get_admin_service),
+):
+    """Массовая смена роли / деактивация / реактивация по списку id или фильтру"""
+    return await admin_service.bulk_action(data, current_user.id)
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """Внутренние метрики сервиса (пулы, очереди, кэши)"""
+    return {
+        "password_hashing": HashingExecutor.stats(),
+        "password_admission": get_password_admission().stats(),
+        "access_token_cache": get_token_cache().stats(),
+        "user_cache": UserCache.stats(),
+        "count_cache": CountCache.stats(),
+        "local_cache": CacheInvalidator.stats(),
+        "db_pool": pool_stats(engine),
+        "db_replica_pool": pool_stats(replica_engine) if replica_engine is not None else None,
+    }
@@ -1,9 +1,9 @@
 ﻿from fastapi import APIRouter, Depends, status, Response, Request
-from redis.asyncio import Redis
 
-from src.Models.User import User
 from src.schemes.schemes import Registration, UpdateUser, UserResponse, LoginRequest
-from src.di.dependencies import get_auth_service, get_current_user, get_redis
+from src.di.dependencies import get_auth_service, get_current_user, get_refresh_tokens
+from src.security.refresh_tokens import RefreshTokenStore
+from src.security.current_user import CurrentUser
 from src.services.auth_service import AuthService
 
 router = APIRouter(tags=["Auth Service"], prefix="/auth")
@@ -32,11 +32,13 @@ async def register(
 async def logout(
     request: Request,
     response: Response,
-    redis: Redis = Depends(get_redis)
+    refresh_tokens: RefreshTokenStore = Depends(get_refresh_tokens)
 ):
+    # выход из одной сессии: версия токенов не растёт, иначе вышли бы все устройства
+    # пользователя; access token этой сессии живёт до exp (ACCESS_TOKEN_EXPIRE_MINUTES)
     refresh_token = request.cookies.get("refresh_token")
     if refresh_token:
-        await redis.delete(f"refresh:{refresh_token}")
+        await refresh_tokens.revoke(refresh_token)
 
     response.delete_cookie("access_token", path="/", httponly=True, secure=True, samesite="lax")
     response.delete_cookie("refresh_token", path="/", httponly=True, secure=True, samesite="lax")
@@ -44,9 +46,21 @@ async def logout(
     return {"message": "Вы вышли из аккаунта"}
 
 
+@router.post("/logout/all")
+async def logout_all(
+        response: Response,
+        current_user: CurrentUser = Depends(get_current_user),
+        auth_service: AuthService = Depends(get_auth_service),
+):
+    """Выход из всех сессий пользователя"""
+    response.delete_cookie("access_token", path="/", httponly=True, secure=True, samesite="lax")
+    response.delete_cookie("refresh_token", path="/", httponly=True, secure=True, samesite="lax")
+    return await auth_service.logout_all(current_user)
+
+
 @router.get("/me", response_model=UserResponse, response_model_exclude_none=True)
 async def get_me(
-        current_user: User = Depends(get_current_user),
+        current_user: CurrentUser = Depends(get_current_user),
         auth_service: AuthService = Depends(get_auth_service),
 ):
     """Получить информацию о текущем пользователе"""
@@ -56,7 +70,7 @@ async def get_me(
 @router.put("/profile", response_model=UserResponse, response_model_exclude_none=True)
 async def update_profile(
         request: UpdateUser,
-        current_user: User = Depends(get_current_user),
+        current_user: CurrentUser = Depends(get_current_user),
         auth_service: AuthService = Depends(get_auth_service),
 ):
     """Обновление профиля текущего пользователя (частичное обновление поддерживается)"""
@@ -65,7 +79,7 @@ async def update_profile(
 
 @router.delete("/profile")
 async def delete_user(
-        current_user: User = Depends(get_current_user),
+        current_user: CurrentUser = Depends(get_current_user),
         auth_service: AuthService = Depends(get_auth_service),
 ):
     """Удаление аккаунта пользователя (soft delete: is_active=False)"""
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+
+from src.config.settings import get_settings
+from src.security.jwt_service import get_token_codec
+
+router = APIRouter(tags=["Well-known"], prefix="/.well-known")
+
+
+@router.get("/jwks.json")
+async def get_jwks():
+    """Публичные ключи для локальной проверки access токенов другими сервисами"""
+    return Response(
+        content=get_token_codec().jwks,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={get_settings().app.jwks_max_age}"},
+    )
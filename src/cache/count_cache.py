@@ -0,0 +1,57 @@
+from redis.asyncio import Redis
+
+
+class CountCache:
+    """Кэш COUNT(*) для пагинации в Redis.
+
+    Ключ включает поколение таблицы: вставка или soft delete увеличивают
+    поколение, и все закэшированные счётчики таблицы сразу перестают читаться
+    (старые ключи истекают по TTL).
+    """
+
+    # поколение и значение за один round trip
+    _GET = """
+    local generation = redis.call('GET', KEYS[1]) or '0'
+    return {generation, redis.call('GET', ARGV[1] .. generation .. ':' .. ARGV[2]) or false}
+    """
+
+    hits = 0
+    misses = 0
+
+    def __init__(self, redis: Redis, ttl: int):
+        self.redis = redis
+        self.ttl = ttl
+
+    @staticmethod
+    def _generation_key(table: str) -> str:
+        return f"count:{table}:gen"
+
+    @staticmethod
+    def _prefix(table: str) -> str:
+        return f"count:{table}:"
+
+    async def get(self, table: str, digest: str) -> tuple[str, int | None]:
+        """(поколение, значение) — поколение нужно передать в set"""
+        generation, value = await self.redis.eval(
+            self._GET, 1, self._generation_key(table), self._prefix(table), digest
+        )
+        if value is None:
+            CountCache.misses += 1
+            return generation, None
+        CountCache.hits += 1
+        return generation, int(value)
+
+    async def set(self, table: str, digest: str, generation: str, value: int) -> None:
+        await self.redis.set(f"{self._prefix(table)}{generation}:{digest}", value, ex=self.ttl)
+
+    async def invalidate(self, table: str) -> None:
+        await self.redis.incr(self._generation_key(table))
+
+    @classmethod
+    def stats(cls) -> dict:
+        total = cls.hits + cls.misses
+        return {
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "hit_ratio": round(cls.hits / total, 4) if total else 0.0,
+        }
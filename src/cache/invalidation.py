@@ -0,0 +1,134 @@
+import asyncio
+import logging
+
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+
+from src.cache.local_cache import LocalCache
+from src.clients.redis import RedisClient
+from src.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class CacheInvalidator:
+    """Локальные (L1) кэши процесса и их инвалидация между воркерами.
+
+    Изменение пользователя публикуется в канал Redis pub/sub, каждый воркер
+    слушает канал и удаляет запись из своих L1. Новая версия токенов
+    публикуется вместе со значением (id:версия) и заменяет в L1 только
+    более старую. TTL записей ограничивает устаревание, если сообщение
+    всё же потерялось.
+    """
+    _user_records: LocalCache | None = None
+    _token_versions: LocalCache | None = None
+    _task: asyncio.Task | None = None
+    received = 0
+
+    @classmethod
+    def _channel(cls) -> str:
+        return get_settings().redis_config.cache_invalidation_channel
+
+    @classmethod
+    def user_records(cls) -> LocalCache:
+        if cls._user_records is None:
+            setting = get_settings().redis_config
+            cls._user_records = LocalCache(setting.local_cache_size, setting.local_cache_ttl)
+        return cls._user_records
+
+    @classmethod
+    def token_versions(cls) -> LocalCache:
+        if cls._token_versions is None:
+            setting = get_settings().redis_config
+            cls._token_versions = LocalCache(setting.local_cache_size, setting.local_cache_ttl)
+        return cls._token_versions
+
+    @classmethod
+    def evict(cls, user_id: int) -> None:
+        """Удалить пользователя из L1 этого процесса"""
+        cls.user_records().delete(user_id)
+        cls.token_versions().delete(user_id)
+
+    @classmethod
+    def clear(cls) -> None:
+        cls.user_records().clear()
+        cls.token_versions().clear()
+
+    @classmethod
+    def publish(cls, redis: Redis | Pipeline, user_id: int):
+        """Оповестить остальные воркеры (можно передать pipeline)"""
+        cls.evict(user_id)
+        return redis.publish(cls._channel(), user_id)
+
+    @classmethod
+    def publish_many(cls, redis: Redis | Pipeline, user_ids: list[int]):
+        """Одно сообщение на много пользователей: id через запятую"""
+        for user_id in user_ids:
+            cls.evict(user_id)
+        return redis.publish(cls._channel(), ",".join(map(str, user_ids)))
+
+    @classmethod
+    def publish_versions(cls, redis: Redis | Pipeline, versions: dict[int, int]):
+        """Оповестить о новых версиях токенов уже после INCR: id:версия через запятую"""
+        for user_id, version in versions.items():
+            cls.token_versions().set_max(user_id, version)
+        return redis.publish(cls._channel(), ",".join(f"{user_id}:{version}" for user_id, version in versions.items()))
+
+    @classmethod
+    def _apply(cls, item: str) -> None:
+        user_id, _, version = item.partition(":")
+        if version:
+            # запись новее опубликованной версии не трогаем
+            cls.token_versions().set_max(int(user_id), int(version))
+        else:
+            cls.evict(int(user_id))
+
+    @classmethod
+    async def start(cls) -> None:
+        """Запуск подписки на канал инвалидации"""
+        cls._task = asyncio.create_task(cls._listen())
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls._task:
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+            cls._task = None
+            logger.info("Cache invalidation listener stopped")
+
+    @classmethod
+    async def _listen(cls) -> None:
+        channel = cls._channel()
+        while True:
+            try:
+                async with RedisClient.get_client().pubsub() as pubsub:
+                    await pubsub.subscribe(channel)
+                    # пока не были подписаны, сообщения могли потеряться
+                    cls.clear()
+                    logger.info(f"Cache invalidation listener subscribed to {channel}")
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        cls.received += 1
+                        try:
+                            for item in message["data"].split(","):
+                                cls._apply(item)
+                        except ValueError:
+                            logger.error(f"Bad invalidation message: {message['data']}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error: {e}")
+                cls.clear()
+                await asyncio.sleep(1)
+
+    @classmethod
+    def stats(cls) -> dict:
+        return {
+            "user_records": cls.user_records().stats(),
+            "token_versions": cls.token_versions().stats(),
+            "invalidations_received": cls.received,
+        }
@@ -0,0 +1,161 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+
+from redis.asyncio import Redis
+
+from src.Models.User import User
+from src.cache.invalidation import CacheInvalidator
+from src.cache.local_cache import LocalCache
+from src.repositories.user_record import UserRecord
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """Read-through кэш записей пользователей в Redis (L2) с L1 в памяти процесса.
+
+    Запись хранится компактным JSON-массивом под версионированным ключом,
+    email указывает на id. При изменении формата достаточно поднять VERSION —
+    старые ключи просто перестанут читаться и истекут по TTL.
+
+    Хэш пароля в Redis не кладётся: у записи из кэша hash_password = None,
+    логин читает хэш из БД (UserRepository.find_with_password).
+    """
+    VERSION = 2
+    FIELDS = tuple(field for field in UserRecord.FIELDS if field != "hash_password")
+    _DATETIME_FIELDS = (FIELDS.index("created_at"), FIELDS.index("updated_at"))
+    _HASH_INDEX = UserRecord.FIELDS.index("hash_password")
+
+    # email -> id -> запись за один round trip
+    _GET_BY_EMAIL = """
+    local user_id = redis.call('GET', KEYS[1])
+    if not user_id then return nil end
+    return redis.call('GET', ARGV[1] .. user_id)
+    """
+
+    hits = 0
+    misses = 0
+    _background: set[asyncio.Task] = set()
+
+    def __init__(self, redis: Redis, ttl: int, local: LocalCache | None = None):
+        self.redis = redis
+        self.ttl = ttl
+        self.local = local
+
+    @classmethod
+    def _key(cls, user_id: int) -> str:
+        return f"user:v{cls.VERSION}:{user_id}"
+
+    @classmethod
+    def _email_key(cls, email: str) -> str:
+        return f"user:v{cls.VERSION}:email:{email}"
+
+    @classmethod
+    def _dump(cls, user: User | UserRecord) -> str:
+        values = []
+        for field in cls.FIELDS:
+            value = getattr(user, field)
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            values.append(value)
+        return json.dumps(values, separators=(",", ":"))
+
+    @classmethod
+    def _load(cls, raw: str) -> UserRecord:
+        values = json.loads(raw)
+        for index in cls._DATETIME_FIELDS:
+            if values[index] is not None:
+                values[index] = datetime.fromisoformat(values[index])
+        values.insert(cls._HASH_INDEX, None)
+        return UserRecord(*values)
+
+    @classmethod
+    def _count(cls, hit: bool) -> None:
+        if hit:
+            cls.hits += 1
+        else:
+            cls.misses += 1
+
+    async def get(self, user_id: int) -> UserRecord | None:
+        if self.local is not None:
+            raw = self.local.get(user_id)
+            if raw is not None:
+                self._count(True)
+                return self._load(raw)
+        raw = await self.redis.get(self._key(user_id))
+        self._count(raw is not None)
+        if raw is None:
+            return None
+        if self.local is not None:
+            self.local.set(user_id, raw)
+        return self._load(raw)
+
+    async def get_by_email(self, email: str) -> UserRecord | None:
+        raw = await self.redis.eval(self._GET_BY_EMAIL, 1, self._email_key(email), self._key(""))
+        user = self._load(raw) if raw is not None else None
+        # указатель email мог устареть после смены email
+        if user is not None and user.email != email:
+            user = None
+        self._count(user is not None)
+        return user
+
+    async def set(self, user: User | UserRecord) -> None:
+        raw = self._dump(user)
+        if self.local is not None:
+            self.local.set(user.id, raw)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(user.id), raw, ex=self.ttl)
+            pipe.set(self._email_key(user.email), user.id, ex=self.ttl)
+            await pipe.execute()
+
+    async def invalidate(self, user_id: int | None = None, email: str | None = None) -> None:
+        """Удалить запись из Redis и из L1 всех воркеров"""
+        keys = []
+        if user_id is not None:
+            keys.append(self._key(user_id))
+        if email is not None:
+            keys.append(self._email_key(email))
+        if not keys:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(*keys)
+            if user_id is not None:
+                CacheInvalidator.publish(pipe, user_id)
+            await pipe.execute()
+
+    async def invalidate_many(self, users: list[tuple[int, str]]) -> None:
+        """Удалить записи (id, email) одним pipeline и оповестить воркеры"""
+        if not users:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(*(self._key(user_id) for user_id, _ in users))
+            pipe.delete(*(self._email_key(email) for _, email in users))
+            CacheInvalidator.publish_many(pipe, [user_id for user_id, _ in users])
+            await pipe.execute()
+
+    def invalidate_later(self, user_id: int, delay: float) -> None:
+        """Повторная инвалидация через delay секунд.
+
+        Запись, прочитанная с отстающей реплики уже после commit, не останется в кэше.
+        """
+        async def _invalidate() -> None:
+            await asyncio.sleep(delay)
+            try:
+                await self.invalidate(user_id)
+            except Exception as e:
+                logger.error(f"Delayed cache invalidation failed: {e}")
+
+        task = asyncio.create_task(_invalidate())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    @classmethod
+    def stats(cls) -> dict:
+        total = cls.hits + cls.misses
+        return {
+            "hits": cls.hits,
+            "misses": cls.misses,
+            "hit_ratio": round(cls.hits / total, 4) if total else 0.0,
+        }
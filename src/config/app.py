@@ -1,4 +1,6 @@
-﻿from pydantic import SecretStr
+﻿from typing import Literal
+
+from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,9 +12,37 @@ class AppConfig(BaseSettings):
     jwt_issuer: str
     jwt_audience: str
 
+    # ES256 / EdDSA: каталог с PEM-ключами <kid>.pem; подписывает jwt_active_kid,
+    # остальные ключи только проверяют токены и публикуются в JWKS (ротация)
+    jwt_keys_dir: str | None = None
+    jwt_active_kid: str | None = None
+    jwks_max_age: int = 300
+
     access_token_expire_minutes: int = 1
     refresh_token_expire_days: int = 7
     cookie_expire_one_min: int = 60
+    # сколько refresh сессий (устройств) у пользователя одновременно, старейшие вытесняются
+    max_sessions_per_user: int = 10
+    # сколько проверенных access токенов держать в памяти процесса
+    access_token_cache_size: int = 10000
+
+    # пул для bcrypt (thread / process)
+    password_hashing_executor: Literal["thread", "process"] = "thread"
+    password_hashing_pool_size: int = 4
+
+    # схема для новых хэшей; cost=None — значение схемы по умолчанию
+    # (подобрать под своё железо: python calibrate_hasher.py)
+    password_scheme: Literal["bcrypt", "scrypt", "argon2id"] = "bcrypt"
+    password_hash_cost: int | None = None
+
+    # admission control для login/register
+    password_hashing_max_concurrency: int = 8
+    password_hashing_max_queue: int = 32
+    password_hashing_queue_timeout: float = 2.0
+    password_hashing_retry_after: int = 1
+
+    # total в списках: exact / estimated / cached / none (можно переопределить в запросе)
+    pagination_count_mode: Literal["exact", "estimated", "cached", "none"] = "exact"
 
     model_config = SettingsConfigDict(
         extra="ignore",
@@ -1,11 +1,107 @@
-﻿from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker, AsyncEngine
+﻿import time
 
+from sqlalchemy import event, Select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker, AsyncEngine
+from sqlalchemy.orm import Session, ORMExecuteState
+
+from src.config.pool import engine_options
 from src.config.settings import get_settings
 
 #src/config/core.py
 
 
-engine = create_async_engine(get_settings().database.get_database, echo=False, pool_size=5, max_overflow=10 )
+def _create_engine(url: str) -> AsyncEngine:
+    return create_async_engine(url, echo=False, **engine_options())
+
+
+engine = _create_engine(get_settings().database.get_database)
+
+replica_engine: AsyncEngine | None = None
+if get_settings().database.get_replica_database:
+    replica_engine = _create_engine(get_settings().database.get_replica_database)
+
+STICKY_COOKIE = "db_primary_until"
+
+
+class TrackedSession(Session):
+    """Session, которая помнит, выполнялась ли в ней запись.
+
+    Если настроена реплика и сессии разрешено читать с неё (info["use_replica"]),
+    SELECT до первой записи уходят на реплику, всё остальное — на primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+                replica_engine is not None
+                and self.info.get("use_replica")
+                and not self.info.get("has_writes")
+                and not self._flushing
+                and isinstance(clause, Select)
+        ):
+            return replica_engine.sync_engine
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+@event.listens_for(TrackedSession, "do_orm_execute")
+def _track_orm_write(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        session = orm_execute_state.session
+        session.info["has_writes"] = True
+        mark_sticky(session)
+
+
+@event.listens_for(TrackedSession, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    session.info["has_writes"] = True
+    mark_sticky(session)
+
+
+def mark_sticky(session: Session) -> None:
+    """read-your-writes: после записи клиент какое-то время читает с primary"""
+    response = session.info.get("response")
+    if replica_engine is None or response is None:
+        return
+    window = get_settings().database.read_your_writes_window
+    response.set_cookie(
+        STICKY_COOKIE,
+        str(int(time.time()) + window),
+        max_age=window,
+        httponly=True,
+        secure=True,
+        samesite="lax",
+        path="/",
+    )
+
+
+def is_sticky(cookies: dict) -> bool:
+    try:
+        return int(cookies.get(STICKY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def has_writes(session: AsyncSession) -> bool:
+    """Были ли в сессии изменения, которые нужно закоммитить"""
+    return bool(
+        session.info.get("has_writes")
+        or session.new
+        or session.dirty
+        or session.deleted
+    )
+
+
+async def release_if_read_only(session: AsyncSession) -> None:
+    """Вернуть соединение в пул сразу после чтения, если в сессии не было записи.
+
+    Сессия остаётся рабочей: следующий запрос возьмёт соединение заново.
+    """
+    if session.in_transaction() and not has_writes(session):
+        await session.close()
 
 
-local_session = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
\ No newline at end of file
+local_session = async_sessionmaker(
+    engine,
+    expire_on_commit=False,
+    class_=AsyncSession,
+    sync_session_class=TrackedSession,
+)
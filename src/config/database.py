@@ -1,4 +1,6 @@
-﻿from pydantic import computed_field
+﻿from typing import Literal
+
+from pydantic import computed_field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,6 +14,25 @@ class DatabaseConfig(BaseSettings):
     postgres_user: str
     postgres_db: str
 
+    # internal — пул в приложении, external — PgBouncer (transaction mode)
+    postgres_pool_mode: Literal["internal", "external"] = "internal"
+
+    # пул соединений (только для internal)
+    postgres_pool_size: int = 5
+    postgres_max_overflow: int = 10
+    # сколько секунд ждать свободное соединение, затем TimeoutError
+    postgres_pool_timeout: float = 30.0
+    # пересоздавать соединения старше N секунд (-1 — никогда, как было до настройки пула)
+    postgres_pool_recycle: int = -1
+    postgres_pool_pre_ping: bool = False
+    # кэш prepared statements asyncpg на соединение
+    postgres_statement_cache_size: int = 100
+
+    # реплика для чтения (опционально)
+    postgres_replica_host: str | None = None
+    postgres_replica_port: int | None = None
+    # сколько секунд после своей записи пользователь читает с primary
+    read_your_writes_window: int = 5
 
     model_config = SettingsConfigDict(
         extra="ignore",
@@ -25,4 +46,14 @@ class DatabaseConfig(BaseSettings):
     def get_database(self) -> str:
         return (f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@"
                 f"{self.postgres_host}:{self.postgres_host_port}/{self.postgres_db}"
-                )
\ No newline at end of file
+                )
+
+    @computed_field
+    @property
+    def get_replica_database(self) -> str | None:
+        if not self.postgres_replica_host:
+            return None
+        return (f"postgresql+asyncpg://{self.postgres_user}:{self.postgres_password}@"
+                f"{self.postgres_replica_host}:{self.postgres_replica_port or self.postgres_host_port}/"
+                f"{self.postgres_db}"
+                )
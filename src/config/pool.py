@@ -0,0 +1,101 @@
+import time
+from typing import Literal
+from uuid import uuid4
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+from src.config.settings import get_settings
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул соединений, который считает ожидание checkout и таймауты.
+
+    Время ожидания включает установку нового соединения, если пул его создаёт.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        self.checkouts += 1
+        self.wait_total += waited
+        if waited > self.wait_max:
+            self.wait_max = waited
+        return connection
+
+    def recreate(self):
+        # при пересоздании пула (после dispose/ошибок) счётчики сохраняются
+        new_pool = super().recreate()
+        new_pool.checkouts = self.checkouts
+        new_pool.timeouts = self.timeouts
+        new_pool.wait_total = self.wait_total
+        new_pool.wait_max = self.wait_max
+        return new_pool
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size(),
+            "checked_in": self.checkedin(),
+            "checked_out": self.checkedout(),
+            "overflow": max(self.overflow(), 0),
+            "max_overflow": self._max_overflow,
+            "timeout": self._timeout,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    """Метрики пула движка (для других классов пула — только статус)"""
+    pool = engine.sync_engine.pool
+    if isinstance(pool, InstrumentedPool):
+        return pool.stats()
+    return {"status": pool.status()}
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def engine_options(mode: Literal["internal", "external"] | None = None) -> dict:
+    """Параметры create_async_engine под режим пулинга (по умолчанию POSTGRES_POOL_MODE).
+
+    internal — пул держит приложение (InstrumentedPool).
+    external — перед Postgres стоит PgBouncer в transaction mode: своего пула нет
+    (NullPool), кэш prepared statements выключен, имена statement уникальны,
+    чтобы разные клиенты на одном серверном соединении не конфликтовали.
+    """
+    setting = get_settings().database
+    if (mode or setting.postgres_pool_mode) == "external":
+        return {
+            "poolclass": NullPool,
+            "connect_args": {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": _unique_statement_name,
+            },
+        }
+    return {
+        "poolclass": InstrumentedPool,
+        "pool_size": setting.postgres_pool_size,
+        "max_overflow": setting.postgres_max_overflow,
+        "pool_timeout": setting.postgres_pool_timeout,
+        "pool_recycle": setting.postgres_pool_recycle,
+        "pool_pre_ping": setting.postgres_pool_pre_ping,
+        "connect_args": {"prepared_statement_cache_size": setting.postgres_statement_cache_size},
+    }
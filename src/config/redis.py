@@ -7,7 +7,14 @@ class RedisConfig(BaseSettings):
     redis_port: int
     redis_host_port: int
     redis_password: str
-    redis_cache_ttl: str = 300
+    redis_cache_ttl: int = 300
+
+    # L1-кэш в памяти воркера + инвалидация через pub/sub
+    local_cache_size: int = 10000
+    local_cache_ttl: float = 5.0
+    cache_invalidation_channel: str = "cache:invalidate"
+    # TTL закэшированных COUNT(*) для пагинации (режим count=cached)
+    count_cache_ttl: int = 60
 
 
     model_config = SettingsConfigDict(
@@ -1,13 +1,20 @@
 ﻿from typing import Annotated, AsyncGenerator
-from fastapi import Depends, HTTPException, status, Request
+from fastapi import Depends, HTTPException, status, Request, Response
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from src.Models.User import User
+from src.cache.count_cache import CountCache
+from src.cache.invalidation import CacheInvalidator
+from src.cache.user_cache import UserCache
 from src.clients.redis import RedisClient
-from src.config.core import local_session
+from src.config.settings import get_settings
+from src.config.core import local_session, has_writes, is_sticky
+from src.security.admission import AdmissionController, get_password_admission
+from src.security.current_user import CurrentUser
 from src.security.jwt_service import JwtService
+from src.security.refresh_tokens import RefreshTokenStore
+from src.security.token_version import TokenVersionStore
 from src.services.admin_service import AdminService
 from src.services.auth_service import AuthService
 from src.repositories.user_repository import UserRepository
@@ -18,12 +25,43 @@ from src.exceptions.custom_exceptions import (
 logger = logging.getLogger(__name__)
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    """Dependency для получения сессии базы данных"""
+async def _run_after_commit(session: AsyncSession) -> None:
+    """Выполнить after_commit-колбэки сессии.
+
+    Данные уже закоммичены, поэтому при ошибке одного колбэка остальные
+    (инвалидация кэша, версии токенов) всё равно выполняются; ошибка
+    логируется и пробрасывается — запрос завершается 500, а не 2xx.
+    """
+    error = None
+    for callback in session.info.pop("after_commit", []):
+        try:
+            await callback()
+        except Exception as e:
+            logger.exception(f"after_commit callback {getattr(callback, '__qualname__', callback)} failed: {e}")
+            error = error or e
+    if error is not None:
+        raise error
+
+
+async def get_session(request: Request, response: Response) -> AsyncGenerator[AsyncSession, None]:
+    """Dependency для получения сессии базы данных.
+
+    Соединение берётся из пула только при первом запросе, COMMIT
+    отправляется только если в сессии была запись. Чтения идут на реплику,
+    если клиент недавно сам не писал (cookie read-your-writes).
+
+    Подключается через SessionDepends (scope="function"): COMMIT, after_commit-колбэки
+    и возврат соединения в пул выполняются до отправки ответа, ошибка commit
+    превращается в 500, а не теряется после 2xx.
+    """
     async with local_session() as session:
+        session.info["response"] = response
+        session.info["use_replica"] = not is_sticky(request.cookies)
         try:
             yield session
-            await session.commit()
+            if has_writes(session):
+                await session.commit()
+                await _run_after_commit(session)
         except HTTPException:
             await session.rollback()
             raise
@@ -34,16 +72,55 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+# FastAPI кэширует зависимость по (функция, scope) — все обработчики должны
+# использовать эту, иначе в одном запросе окажутся две сессии
+SessionDepends = Depends(get_session, scope="function")
+
+
 def get_redis() -> Redis:
     """FastAPI dependency для получения Redis клиента"""
     return RedisClient.get_client()
 
 
+def get_user_cache(
+        redis: Annotated[Redis, Depends(get_redis)],
+) -> UserCache:
+    """Dependency для кэша пользователей"""
+    return UserCache(
+        redis,
+        get_settings().redis_config.redis_cache_ttl,
+        local=CacheInvalidator.user_records(),
+    )
+
+
+def get_count_cache(
+        redis: Annotated[Redis, Depends(get_redis)],
+) -> CountCache:
+    """Dependency для кэша COUNT(*) пагинации"""
+    return CountCache(redis, get_settings().redis_config.count_cache_ttl)
+
+
 def get_user_repository(
-        session: Annotated[AsyncSession, Depends(get_session)],
+        session: Annotated[AsyncSession, SessionDepends],
+        cache: Annotated[UserCache, Depends(get_user_cache)],
+        counts: Annotated[CountCache, Depends(get_count_cache)],
 ) -> UserRepository:
     """Factory для создания AuthRepository с сессией"""
-    return UserRepository(session=session)
+    return UserRepository(session=session, cache=cache, counts=counts)
+
+
+def get_token_versions(
+        redis: Annotated[Redis, Depends(get_redis)],
+) -> TokenVersionStore:
+    """Dependency для версий токенов"""
+    return TokenVersionStore(redis, local=CacheInvalidator.token_versions())
+
+
+def get_refresh_tokens(
+        redis: Annotated[Redis, Depends(get_redis)],
+) -> RefreshTokenStore:
+    """Dependency для refresh токенов и сессий пользователей"""
+    return RefreshTokenStore(redis, get_settings().app.max_sessions_per_user)
 
 
 def get_jwt_service(
@@ -56,45 +133,52 @@ def get_jwt_service(
 async def get_auth_service(
         repository: Annotated[UserRepository, Depends(get_user_repository)],
         jwt_service: Annotated[JwtService, Depends(get_jwt_service)],
-        redis: Annotated[Redis, Depends(get_redis)],
+        refresh_tokens: Annotated[RefreshTokenStore, Depends(get_refresh_tokens)],
+        admission: Annotated[AdmissionController, Depends(get_password_admission)],
+        token_versions: Annotated[TokenVersionStore, Depends(get_token_versions)],
 ) -> AuthService:
     """Dependency для AuthService"""
-    return AuthService(repository, jwt_service, redis)
+    return AuthService(repository, jwt_service, refresh_tokens, admission, token_versions)
 
 
 async def get_admin_service(
         repository: Annotated[UserRepository, Depends(get_user_repository)],
+        token_versions: Annotated[TokenVersionStore, Depends(get_token_versions)],
+        refresh_tokens: Annotated[RefreshTokenStore, Depends(get_refresh_tokens)],
 ) -> AdminService:
     """Dependency для AdminService"""
-    return AdminService(repository)
+    return AdminService(repository, token_versions, refresh_tokens)
 
 
 async def get_current_user(
         request: Request,
         repository: Annotated[UserRepository, Depends(get_user_repository)],
-) -> User:
-    """Получить текущего пользователя по токену"""
+        token_versions: Annotated[TokenVersionStore, Depends(get_token_versions)],
+) -> CurrentUser:
+    """Получить текущего пользователя по токену (без запроса в БД)"""
     token = request.cookies.get("access_token")
     if not token:
         raise InvalidCredentialsException(detail="Not authenticated")
-    payload = JwtService.decode_token(token)
+    payload = JwtService.decode_token_cached(token)
     if not payload or payload.get("type") != "access":
         raise InvalidCredentialsException(detail="Invalid token")
     try:
         user_id = int(payload["sub"])
-    except (ValueError, KeyError):
+        role = payload["role"]
+        token_version = int(payload["ver"])
+    except (ValueError, KeyError, TypeError):
         raise InvalidCredentialsException(detail="Invalid token")
-    user = await repository.find_by_id(user_id)
-    if not user or not user.is_active:
-        raise InvalidCredentialsException(detail="User not found or inactive")
-    return user
+    # версия растёт при отзыве, деактивации и смене роли
+    if token_version != await token_versions.get(user_id):
+        raise InvalidCredentialsException(detail="Token revoked")
+    return CurrentUser(user_id, role, token_version, repository)
 
 
 async def require_admin(
-        current_user: Annotated[User, Depends(get_current_user)],
-) -> User:
+        current_user: Annotated[CurrentUser, Depends(get_current_user)],
+) -> CurrentUser:
     """Проверить что текущий пользователь админ"""
-    if current_user.role != "admin":
+    if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
@@ -50,6 +50,17 @@ class AlreadyExistsException(HTTPException):
         )
 
 
+class ServiceOverloadedException(HTTPException):
+    """Сервис перегружен, запрос отброшен без обработки (503)"""
+
+    def __init__(self, detail: str = "Service overloaded", retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+
 class RequestValidationException(HTTPException):
     """Исключение для кастомной валидации (400)"""
 
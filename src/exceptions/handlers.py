@@ -81,5 +81,6 @@ async def http_exception_handler(
         content={
             "detail": exc.detail,
             "code": exc.status_code,
-        }
+        },
+        headers=exc.headers,
     )
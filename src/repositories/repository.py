@@ -35,16 +35,22 @@ class Repository(Generic[T]):
         return entity
 
     async def update(self, _id: int, _dict: dict):
-        """Обновляет поля которые были переданы (unset значения игнорируются)"""
+        """Обновляет поля которые были переданы (unset значения игнорируются).
+
+        UPDATE ... RETURNING за один запрос, None — если строка не найдена.
+        """
         update_dict = {k: v for k, v in _dict.items() if v is not None}
         if not update_dict:
             return await self.find_by_id(_id)
 
-        await self.session.execute(
-            update(self.model).where(self.model.id == _id).values(**update_dict)
+        entity = await self.session.scalar(
+            update(self.model)
+            .where(self.model.id == _id)
+            .values(**update_dict)
+            .returning(self.model)
+            .execution_options(populate_existing=True)
         )
-        await self.session.flush()
-        return await self.find_by_id(_id)
+        return entity
 
     async def soft_delete(self, entity: Type[T]):
         entity.is_active = False
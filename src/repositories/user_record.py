@@ -0,0 +1,40 @@
+from datetime import datetime
+
+
+class UserRecord:
+    """Лёгкая запись пользователя для чтения (без ORM и identity map).
+
+    Порядок FIELDS совпадает с порядком колонок в запросах UserRepository
+    и в кэше, поэтому запись собирается из строки позиционно. У записи
+    из кэша hash_password = None.
+    """
+    FIELDS = (
+        "id", "email", "first_name", "last_name", "hash_password",
+        "is_active", "role", "created_at", "updated_at",
+    )
+    __slots__ = FIELDS
+
+    def __init__(
+            self,
+            id: int,
+            email: str,
+            first_name: str,
+            last_name: str,
+            hash_password: str | None,
+            is_active: bool,
+            role: str,
+            created_at: datetime,
+            updated_at: datetime | None,
+    ):
+        self.id = id
+        self.email = email
+        self.first_name = first_name
+        self.last_name = last_name
+        self.hash_password = hash_password
+        self.is_active = is_active
+        self.role = role
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    def __repr__(self) -> str:
+        return f"UserRecord(id={self.id!r}, email={self.email!r}, role={self.role!r})"
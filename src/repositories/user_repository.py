@@ -1,39 +1,192 @@
-﻿from typing import List
+﻿from typing import Awaitable, Callable, List, Sequence
 
-from sqlalchemy import select, update, ScalarResult, Sequence
+from sqlalchemy import select, update, bindparam, Select, Integer, any_
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.Models.User import User
+from src.cache.count_cache import CountCache
+from src.cache.user_cache import UserCache
+from src.config.core import release_if_read_only, replica_engine
+from src.config.settings import get_settings
+from src.repositories.user_record import UserRecord
+
+
+def after_commit(session: AsyncSession, callback: Callable[[], Awaitable[None]]) -> None:
+    """Выполнить callback после успешного commit сессии (см. get_session)"""
+    session.info.setdefault("after_commit", []).append(callback)
+
+
+_users = User.__table__
+_RECORD_COLUMNS = [_users.c[field] for field in UserRecord.FIELDS]
+
+# Готовые Core-запросы для горячих чтений: собираются один раз, ключ
+# кэша компиляции вычисляется один раз, строки не проходят через ORM
+_SELECT_BY_ID = select(*_RECORD_COLUMNS).where(_users.c.id == bindparam("id"))
+_SELECT_BY_EMAIL = select(*_RECORD_COLUMNS).where(_users.c.email == bindparam("email"))
 
 
 class UserRepository:
-    """Repository для работы с пользователями"""
+    """Repository для работы с пользователями.
 
-    def __init__(self, session: AsyncSession):
+    Чтения, update и add_if_absent возвращают UserRecord, add — ORM-объект User.
+    """
+
+    def __init__(self, session: AsyncSession, cache: UserCache | None = None, counts: CountCache | None = None):
         self.session = session
         self.model = User
+        self.cache = cache
+        self.counts = counts
+
+    def after_commit(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Выполнить callback после commit транзакции репозитория"""
+        after_commit(self.session, callback)
+
+    def _invalidate_counts(self) -> None:
+        """Закэшированные total списков устаревают после вставки/удаления"""
+        if self.counts:
+            after_commit(self.session, lambda: self.counts.invalidate(_users.name))
 
-    async def find_by_id(self, _id: int):
+    async def _fetch_record(
+            self, statement: Select, params: dict | None = None, primary: bool = False,
+    ) -> UserRecord | None:
+        use_replica = self.session.info.get("use_replica")
+        if primary:
+            self.session.info["use_replica"] = False
+        try:
+            row = (await self.session.execute(statement, params)).first()
+        finally:
+            self.session.info["use_replica"] = use_replica
+        await release_if_read_only(self.session)
+        return UserRecord(*row) if row is not None else None
+
+    async def find_by_id(self, _id: int) -> UserRecord | None:
         """Найти пользователя по ID"""
-        entity = await self.session.scalar(select(self.model).where(self.model.id == _id))
-        return entity
+        if self.cache:
+            cached = await self.cache.get(_id)
+            if cached is not None:
+                return cached
+        record = await self._fetch_record(_SELECT_BY_ID, {"id": _id})
+        if self.cache and record is not None:
+            await self.cache.set(record)
+        return record
 
-    async def find_one_or_none(self, _filter: dict):
+    async def find_one_or_none(self, _filter: dict) -> UserRecord | None:
         """Найти одного пользователя по фильтру или вернуть None"""
-        entity = await self.session.scalar(select(self.model).filter_by(**_filter))
-        return entity
+        if _filter.keys() == {"email"}:
+            return await self._find_by_email(_filter["email"])
+        statement = select(*_RECORD_COLUMNS).where(
+            *(_users.c[field] == value for field, value in _filter.items())
+        )
+        return await self._fetch_record(statement)
+
+    async def _find_by_email(self, email: str) -> UserRecord | None:
+        if self.cache:
+            cached = await self.cache.get_by_email(email)
+            if cached is not None:
+                return cached
+        record = await self._fetch_record(_SELECT_BY_EMAIL, {"email": email})
+        if self.cache and record is not None:
+            await self.cache.set(record)
+        return record
+
+    async def find_with_password(self, email: str) -> UserRecord | None:
+        """Найти пользователя по email вместе с хэшем пароля — с primary, мимо кэша"""
+        return await self._fetch_record(_SELECT_BY_EMAIL, {"email": email}, primary=True)
+
+    async def find_for_token(self, _id: int) -> UserRecord | None:
+        """Найти пользователя по ID с primary, мимо кэша — перед выдачей токенов.
+
+        Реплика и кэш могут ещё отдавать роль / is_active до смены, а токен
+        получит уже новую версию и проживёт до exp.
+        """
+        record = await self._fetch_record(_SELECT_BY_ID, {"id": _id}, primary=True)
+        if self.cache and record is not None:
+            await self.cache.set(record)
+        return record
 
     async def add(self, entity: dict) -> User:
         """Добавить нового пользователя"""
         user = self.model(**entity)
         self.session.add(user)
         await self.session.flush()
+        if self.cache:
+            email = user.email
+            after_commit(self.session, lambda: self.cache.invalidate(email=email))
+        self._invalidate_counts()
         return user
 
-    async def update(self, _id: int, data: dict) -> User:
-        """Обновить пользователя по ID (частичное обновление)"""
-        await self.session.execute(update(self.model).where(self.model.id == _id).values(**data))
-        refreshed = await self.session.get(self.model, _id)
-        if refreshed is None:
-            raise ValueError("User not found after update")
-        return refreshed
+    async def add_if_absent(self, entity: dict) -> UserRecord | None:
+        """Добавить пользователя, если email свободен.
+
+        Один INSERT ... ON CONFLICT (email) DO NOTHING RETURNING: проверка
+        и вставка атомарны, None — если email уже занят.
+        """
+        result = await self.session.execute(
+            insert(_users)
+            .values(**entity)
+            .on_conflict_do_nothing(index_elements=[_users.c.email])
+            .returning(*_RECORD_COLUMNS)
+        )
+        row = result.first()
+        if row is None:
+            return None
+        if self.cache:
+            email = row.email
+            after_commit(self.session, lambda: self.cache.invalidate(email=email))
+        self._invalidate_counts()
+        return UserRecord(*row)
+
+    async def _invalidate_after_commit(self, _id: int) -> None:
+        await self.cache.invalidate(_id)
+        if replica_engine is not None:
+            # реплика может ещё отдавать старую запись
+            self.cache.invalidate_later(_id, get_settings().database.read_your_writes_window)
+
+    async def update(self, _id: int, data: dict) -> UserRecord | None:
+        """Обновить пользователя по ID (частичное обновление).
+
+        Один запрос UPDATE ... RETURNING; None — если строки с таким id нет.
+        """
+        if self.cache:
+            # до commit — чтобы этот же запрос не прочитал старую запись,
+            # после commit — чтобы не осталась запись, закэшированная параллельным чтением
+            await self.cache.invalidate(_id)
+            after_commit(self.session, lambda: self._invalidate_after_commit(_id))
+        if "is_active" in data:
+            self._invalidate_counts()
+        result = await self.session.execute(
+            update(_users).where(_users.c.id == _id).values(**data).returning(*_RECORD_COLUMNS)
+        )
+        row = result.first()
+        return UserRecord(*row) if row is not None else None
+
+    async def bulk_update(
+            self,
+            values: dict,
+            ids: list[int] | None = None,
+            conditions: Sequence = (),
+            exclude_id: int | None = None,
+            limit: int | None = None,
+    ) -> list[tuple[int, str]]:
+        """Обновить набор пользователей одним UPDATE ... WHERE id = ANY(...) RETURNING.
+
+        limit — не больше limit строк (id IN (SELECT id ... LIMIT limit)).
+        Возвращает (id, email) изменённых строк.
+        """
+        where = list(conditions)
+        if ids is not None:
+            where.append(_users.c.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+        if exclude_id is not None:
+            where.append(_users.c.id != exclude_id)
+        if limit is not None:
+            where = [_users.c.id.in_(select(_users.c.id).where(*where).limit(limit))]
+        statement = update(_users).values(**values).where(*where).returning(_users.c.id, _users.c.email)
+        rows = [tuple(row) for row in (await self.session.execute(statement)).all()]
+        if self.cache and rows:
+            await self.cache.invalidate_many(rows)
+            after_commit(self.session, lambda: self.cache.invalidate_many(rows))
+        if "is_active" in values:
+            self._invalidate_counts()
+        return rows
@@ -0,0 +1,84 @@
+import hashlib
+import json
+from typing import Generic, Literal, TypeVar
+
+from fastapi_pagination import Page
+from sqlalchemy import Select, select, func, column, table, cast, BigInteger
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.cache.count_cache import CountCache
+
+T = TypeVar("T")
+
+CountMode = Literal["exact", "estimated", "cached", "none"]
+
+_pg_class = table("pg_class", column("oid"), column("reltuples"))
+
+
+class CountedPage(Page[T], Generic[T]):
+    """Page, у которой total может отсутствовать (count=none)"""
+    total: int | None = None
+    pages: int | None = None
+
+
+def _literal_sql(statement: Select) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+async def exact_count(session: AsyncSession, statement: Select) -> int:
+    """Точный COUNT(*) по отфильтрованному запросу"""
+    return await session.scalar(select(func.count()).select_from(statement.order_by(None).subquery()))
+
+
+async def estimated_count(session: AsyncSession, statement: Select) -> int:
+    """Оценка без сканирования таблицы.
+
+    Без фильтров — reltuples из pg_class (обновляется autovacuum/ANALYZE),
+    с фильтрами — оценка строк из плана запроса.
+    """
+    statement = statement.order_by(None)
+    if statement.whereclause is None:
+        name = statement.get_final_froms()[0].name
+        reltuples = await session.scalar(
+            select(cast(_pg_class.c.reltuples, BigInteger))
+            .where(_pg_class.c.oid == cast(name, postgresql.REGCLASS))
+        )
+        # -1 — таблицу ещё не анализировали
+        if reltuples is not None and reltuples >= 0:
+            return reltuples
+    # SQL собирается диалектом соединения и уходит драйверу как есть: через text()
+    # ":слово" в значениях фильтра разбиралось бы как bind-параметр
+    connection = await session.connection(bind_arguments={"clause": statement})
+    sql = statement.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def cached_count(session: AsyncSession, statement: Select, counts: CountCache) -> int:
+    """Точный COUNT(*), закэшированный в Redis до TTL или до вставки/удаления"""
+    statement = statement.order_by(None)
+    table_name = statement.get_final_froms()[0].name
+    digest = hashlib.blake2b(_literal_sql(statement).encode(), digest_size=16).hexdigest()
+    generation, value = await counts.get(table_name, digest)
+    if value is None:
+        value = await exact_count(session, statement)
+        await counts.set(table_name, digest, generation, value)
+    return value
+
+
+async def count_total(
+        session: AsyncSession,
+        statement: Select,
+        mode: CountMode,
+        counts: CountCache | None = None,
+) -> int | None:
+    if mode == "none":
+        return None
+    if mode == "estimated":
+        return await estimated_count(session, statement)
+    if mode == "cached" and counts is not None:
+        return await cached_count(session, statement, counts)
+    return await exact_count(session, statement)
@@ -0,0 +1,44 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Generic, TypeVar
+
+from pydantic import BaseModel
+
+from src.exceptions.custom_exceptions import RequestValidationException
+
+T = TypeVar("T")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    """Страница keyset-пагинации: next_cursor передаётся в следующий запрос"""
+    items: list[T]
+    size: int
+    next_cursor: str | None = None
+
+
+def encode_cursor(order_by: str, direction: str, value: Any, _id: int) -> str:
+    """Непрозрачный курсор: (значение поля сортировки, id) последней записи"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([order_by, direction, value, _id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, order_by: str, direction: str, python_type: type) -> tuple[Any, int]:
+    """Вернуть (значение, id) из курсора, выданного для той же сортировки"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_order_by, cursor_direction, value, _id = json.loads(raw)
+        if python_type is datetime:
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, python_type):
+            raise ValueError
+        if not isinstance(_id, int):
+            raise ValueError
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise RequestValidationException(detail="Invalid cursor")
+    if (cursor_order_by, cursor_direction) != (order_by, direction):
+        raise RequestValidationException(detail="Cursor was issued for a different sort order")
+    return value, _id
@@ -1,11 +1,20 @@
 ﻿from typing import ClassVar, Self
-from fastapi_pagination import Page
+from fastapi_pagination import create_page, resolve_params
 from fastapi_pagination.ext.sqlalchemy import paginate
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.Models.base import Base
+from src.cache.count_cache import CountCache
+from src.config.core import release_if_read_only
+from src.config.settings import get_settings
+from src.exceptions.custom_exceptions import RequestValidationException
+from src.schemes.counting import CountMode, CountedPage, count_total
+from src.schemes.cursor import CursorPage, encode_cursor, decode_cursor
 from src.schemes.pagination_filter import PaginationFilter
 
+CURSOR_PAGE_SIZE = 50
+CURSOR_MAX_PAGE_SIZE = 100
+
 
 class PaginationMixin:
     model: ClassVar[type[Base]]
@@ -15,14 +24,66 @@ class PaginationMixin:
         cls,
         session: AsyncSession,
         filter_params: PaginationFilter | None = None,
+        count_mode: CountMode | None = None,
+        counts: CountCache | None = None,
+    ) -> CountedPage[Self]:
 
-    ) -> Page[Self]:
+        """Получить пагинированный список объектов.
 
-        """Получить пагинированный список объектов"""
+        total считается выбранной стратегией (exact / estimated / cached / none),
+        по умолчанию — из настроек.
+        """
         if filter_params is None:
             filter_params = PaginationFilter(page=0, size=1)
+        count_mode = count_mode or get_settings().app.pagination_count_mode
         try:
-            statement = cls.model.get_filter_statement(filter_params)
+            # страницу задают params fastapi_pagination, statement — только фильтры и сортировка
+            statement = cls.model.get_filter_statement(filter_params._replace(page=None, size=None))
         except Exception:
             raise
-        return await paginate(session, statement)
\ No newline at end of file
+        if count_mode == "exact":
+            page = await paginate(session, statement)
+        else:
+            params = resolve_params()
+            raw_params = params.to_raw_params().as_limit_offset()
+            items = (await session.scalars(statement.limit(raw_params.limit).offset(raw_params.offset))).all()
+            total = await count_total(session, statement, count_mode, counts)
+            page = create_page(items, total=total, params=params)
+        await release_if_read_only(session)
+        return page
+
+    @classmethod
+    async def cursor_paginate(
+        cls,
+        session: AsyncSession,
+        filter_params: PaginationFilter,
+        cursor: str | None = None,
+    ) -> CursorPage[Self]:
+        """Keyset-пагинация: стоимость страницы не зависит от глубины, COUNT не считается"""
+        order_by = filter_params.order_by or "id"
+        if order_by not in cls.model.sortable:
+            raise RequestValidationException(
+                detail=f"Cursor pagination supports order_by: {', '.join(cls.model.sortable)}"
+            )
+        size = min(filter_params.size or CURSOR_PAGE_SIZE, CURSOR_MAX_PAGE_SIZE)
+        filter_params = filter_params._replace(order_by=order_by, size=size)
+        direction = filter_params.order_by_direction
+
+        after = None
+        if cursor:
+            python_type = getattr(cls.model, order_by).type.python_type
+            after = decode_cursor(cursor, order_by, direction, python_type)
+
+        rows = (await session.scalars(cls.model.get_keyset_statement(filter_params, after))).all()
+        await release_if_read_only(session)
+
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            last = rows[-1]
+            next_cursor = encode_cursor(order_by, direction, getattr(last, order_by), last.id)
+        return CursorPage[cls](
+            items=[cls.model_validate(row) for row in rows],
+            size=size,
+            next_cursor=next_cursor,
+        )
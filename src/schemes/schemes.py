@@ -1,6 +1,6 @@
 ﻿from datetime import datetime
 from pydantic import BaseModel, model_validator, ConfigDict, EmailStr, Field
-from typing import Optional, ClassVar
+from typing import Optional, ClassVar, Literal
 
 from src.Models.User import User
 from src.schemes.mixin import PaginationMixin
@@ -67,3 +67,45 @@ class UserResponse(BaseModel):
 
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class BulkUserFilter(BaseModel):
+    """Фильтр пользователей для массовой операции (как у списка)"""
+    email: Optional[str] = None
+    search: Optional[str] = Field(default=None, min_length=1, max_length=100)
+    search_mode: Literal["prefix", "contains"] = "prefix"
+
+    @model_validator(mode="after")
+    def validate_not_empty(self):
+        if not self.email and not self.search:
+            raise ValueError("Filter needs email or search")
+        if self.search and self.search_mode == "contains" and len(self.search) < 3:
+            raise ValueError("search_mode=contains needs at least 3 characters")
+        return self
+
+
+# предел пользователей в одной массовой операции — и по списку id, и по фильтру
+BULK_MAX_USERS = 10000
+
+
+class BulkUserAction(BaseModel):
+    """Массовая смена роли / деактивация / реактивация по списку id или фильтру"""
+    action: Literal["set_role", "deactivate", "reactivate"]
+    role: Optional[Literal["admin", "user"]] = None
+    ids: Optional[list[int]] = Field(default=None, min_length=1, max_length=BULK_MAX_USERS)
+    filter: Optional[BulkUserFilter] = None
+
+    @model_validator(mode="after")
+    def validate_target(self):
+        if self.ids is None and self.filter is None:
+            raise ValueError("Either ids or filter is required")
+        if self.action == "set_role" and self.role is None:
+            raise ValueError("role is required for set_role")
+        return self
+
+
+class BulkActionResult(BaseModel):
+    """Итог массовой операции: статус по каждому id"""
+    action: str
+    updated: int
+    results: dict[int, Literal["updated", "not_found", "skipped"]]
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator
+
+from src.config.settings import get_settings
+from src.exceptions.custom_exceptions import ServiceOverloadedException
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """Ограничитель параллельных CPU-тяжёлых операций с ограниченной очередью.
+
+    Если свободного слота нет, запрос ждёт в очереди не дольше queue_timeout.
+    Когда очередь заполнена или ожидание истекло — запрос сразу получает 503.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float, retry_after: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight = 0
+        self._waiting = 0
+
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self.timed_out = 0
+
+    def _reject(self, reason: str) -> ServiceOverloadedException:
+        logger.warning(f"Admission rejected: {reason}")
+        return ServiceOverloadedException(
+            detail="Too many concurrent requests, try again later",
+            retry_after=self.retry_after,
+        )
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Занять слот на время выполнения блока"""
+        if self._semaphore.locked():
+            if self._waiting >= self.max_queue:
+                self.shed += 1
+                raise self._reject("queue is full")
+            self.queued += 1
+            self._waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                raise self._reject("queue wait timeout")
+            finally:
+                self._waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.admitted += 1
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+        }
+
+
+@lru_cache
+def get_password_admission() -> AdmissionController:
+    """Общий ограничитель для хэширования паролей (login/register)"""
+    setting = get_settings().app
+    return AdmissionController(
+        max_concurrency=setting.password_hashing_max_concurrency,
+        max_queue=setting.password_hashing_max_queue,
+        queue_timeout=setting.password_hashing_queue_timeout,
+        retry_after=setting.password_hashing_retry_after,
+    )
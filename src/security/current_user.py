@@ -0,0 +1,32 @@
+from src.exceptions.custom_exceptions import InvalidCredentialsException
+from src.repositories.user_record import UserRecord
+from src.repositories.user_repository import UserRepository
+
+
+class CurrentUser:
+    """Текущий пользователь по claims access токена.
+
+    id и role берутся из токена без обращения к БД, полная запись пользователя
+    загружается только если эндпоинту она действительно нужна.
+    """
+    __slots__ = ("id", "role", "token_version", "_repository", "_user")
+
+    def __init__(self, user_id: int, role: str, token_version: int, repository: UserRepository):
+        self.id = user_id
+        self.role = role
+        self.token_version = token_version
+        self._repository = repository
+        self._user: UserRecord | None = None
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "admin"
+
+    async def load(self) -> UserRecord:
+        """Загрузить запись пользователя (один раз за запрос)"""
+        if self._user is None:
+            user = await self._repository.find_by_id(self.id)
+            if not user or not user.is_active:
+                raise InvalidCredentialsException(detail="User not found or inactive")
+            self._user = user
+        return self._user
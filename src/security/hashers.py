@@ -0,0 +1,210 @@
+import base64
+import hashlib
+import hmac
+import os
+import re
+from abc import ABC, abstractmethod
+
+import bcrypt
+
+try:
+    from argon2 import PasswordHasher as _Argon2PasswordHasher
+    from argon2.exceptions import VerifyMismatchError, InvalidHashError
+except ImportError:  # argon2-cffi — опциональная зависимость
+    _Argon2PasswordHasher = None
+
+
+class PasswordHasher(ABC):
+    """Схема хэширования паролей.
+
+    Объекты должны оставаться picklable: методы hash/verify выполняются
+    в HashingExecutor, в том числе в пуле процессов.
+    """
+    scheme: str
+    default_cost: int
+    min_cost: int
+    max_cost: int
+
+    def __init__(self, cost: int):
+        self.cost = cost
+
+    @abstractmethod
+    def identify(self, hashed: str) -> bool:
+        """Принадлежит ли хэш этой схеме (по префиксу)"""
+
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        ...
+
+    @abstractmethod
+    def verify(self, password: str, hashed: str) -> bool:
+        ...
+
+    @abstractmethod
+    def get_cost(self, hashed: str) -> int | None:
+        """Стоимость, с которой был посчитан хэш"""
+
+    def needs_update(self, hashed: str) -> bool:
+        return self.get_cost(hashed) != self.cost
+
+    def with_cost(self, cost: int) -> "PasswordHasher":
+        return type(self)(cost)
+
+
+class BcryptHasher(PasswordHasher):
+    """bcrypt, cost = log2 числа раундов"""
+    scheme = "bcrypt"
+    default_cost = 12
+    min_cost = 4
+    max_cost = 31
+
+    _pattern = re.compile(r"^\$2[aby]?\$(\d{2})\$")
+
+    def identify(self, hashed: str) -> bool:
+        return self._pattern.match(hashed) is not None
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.cost)
+        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def get_cost(self, hashed: str) -> int | None:
+        match = self._pattern.match(hashed)
+        return int(match.group(1)) if match else None
+
+
+class ScryptHasher(PasswordHasher):
+    """scrypt из hashlib, cost = log2(N). Формат: $scrypt$ln=15,r=8,p=1$<salt>$<hash>"""
+    scheme = "scrypt"
+    default_cost = 15
+    min_cost = 10
+    max_cost = 20
+
+    _prefix = "$scrypt$"
+    _block_size = 8
+    _parallelism = 1
+    _key_length = 32
+
+    def identify(self, hashed: str) -> bool:
+        return hashed.startswith(self._prefix)
+
+    @staticmethod
+    def _b64encode(data: bytes) -> str:
+        return base64.b64encode(data).decode('ascii').rstrip("=")
+
+    @staticmethod
+    def _b64decode(data: str) -> bytes:
+        return base64.b64decode(data + "=" * (-len(data) % 4))
+
+    def _derive(self, password: str, salt: bytes, ln: int, r: int, p: int) -> bytes:
+        n = 2 ** ln
+        return hashlib.scrypt(
+            password.encode('utf-8'),
+            salt=salt,
+            n=n,
+            r=r,
+            p=p,
+            maxmem=256 * n * r * p + 1024 * 1024,
+            dklen=self._key_length,
+        )
+
+    def _parse(self, hashed: str) -> tuple[dict[str, int], bytes, bytes]:
+        _, _, params, salt, digest = hashed.split("$")
+        parsed = {k: int(v) for k, v in (item.split("=") for item in params.split(","))}
+        return parsed, self._b64decode(salt), self._b64decode(digest)
+
+    def hash(self, password: str) -> str:
+        salt = os.urandom(16)
+        digest = self._derive(password, salt, self.cost, self._block_size, self._parallelism)
+        params = f"ln={self.cost},r={self._block_size},p={self._parallelism}"
+        return f"{self._prefix}{params}${self._b64encode(salt)}${self._b64encode(digest)}"
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            params, salt, expected = self._parse(hashed)
+        except (ValueError, KeyError):
+            return False
+        digest = self._derive(password, salt, params["ln"], params["r"], params["p"])
+        return hmac.compare_digest(digest, expected)
+
+    def get_cost(self, hashed: str) -> int | None:
+        try:
+            return self._parse(hashed)[0]["ln"]
+        except (ValueError, KeyError):
+            return None
+
+
+class Argon2Hasher(PasswordHasher):
+    """argon2id (нужен пакет argon2-cffi), cost = time_cost"""
+    scheme = "argon2id"
+    default_cost = 3
+    min_cost = 1
+    max_cost = 20
+
+    _prefix = "$argon2id$"
+
+    def __init__(self, cost: int, memory_cost: int = 65536, parallelism: int = 1):
+        if _Argon2PasswordHasher is None:
+            raise RuntimeError("argon2id requires the argon2-cffi package")
+        super().__init__(cost)
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+
+    def _hasher(self):
+        return _Argon2PasswordHasher(
+            time_cost=self.cost,
+            memory_cost=self.memory_cost,
+            parallelism=self.parallelism,
+        )
+
+    def identify(self, hashed: str) -> bool:
+        return hashed.startswith(self._prefix)
+
+    def hash(self, password: str) -> str:
+        return self._hasher().hash(password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            return self._hasher().verify(hashed, password)
+        except (VerifyMismatchError, InvalidHashError):
+            return False
+
+    def get_cost(self, hashed: str) -> int | None:
+        match = re.search(r"[$,]t=(\d+)", hashed)
+        return int(match.group(1)) if match else None
+
+    def needs_update(self, hashed: str) -> bool:
+        return self._hasher().check_needs_rehash(hashed)
+
+    def with_cost(self, cost: int) -> "Argon2Hasher":
+        return Argon2Hasher(cost, self.memory_cost, self.parallelism)
+
+
+HASHERS: dict[str, type[PasswordHasher]] = {
+    BcryptHasher.scheme: BcryptHasher,
+    ScryptHasher.scheme: ScryptHasher,
+}
+if _Argon2PasswordHasher is not None:
+    HASHERS[Argon2Hasher.scheme] = Argon2Hasher
+
+
+class HasherRegistry:
+    """Набор схем: новые хэши считаются схемой по умолчанию,
+    существующие проверяются той схемой, что указана в префиксе хэша."""
+
+    def __init__(self, default: PasswordHasher, hashers: list[PasswordHasher]):
+        self.default = default
+        self.hashers = [default] + [h for h in hashers if h.scheme != default.scheme]
+
+    def identify(self, hashed: str) -> PasswordHasher | None:
+        for hasher in self.hashers:
+            if hasher.identify(hashed):
+                return hasher
+        return None
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Хэш посчитан устаревшей схемой или с другой стоимостью"""
+        hasher = self.identify(hashed)
+        return hasher is not self.default or self.default.needs_update(hashed)
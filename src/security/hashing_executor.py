@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from src.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HashingExecutor:
+    """Отдельный пул воркеров для хэширования паролей.
+
+    bcrypt занимает CPU на десятки миллисекунд, поэтому вся работа с ним
+    уходит из event loop в пул потоков или процессов.
+    """
+    _executor: Executor | None = None
+    _kind: str | None = None
+    _pool_size: int = 0
+
+    _pending: int = 0
+    _max_pending: int = 0
+    _submitted: int = 0
+    _completed: int = 0
+    _failed: int = 0
+
+    @classmethod
+    def init_pool(cls) -> None:
+        """открытие"""
+        setting = get_settings().app
+        cls._kind = setting.password_hashing_executor
+        cls._pool_size = setting.password_hashing_pool_size
+        if cls._kind == "process":
+            # spawn: fork из процесса с работающим event loop небезопасен
+            cls._executor = ProcessPoolExecutor(
+                max_workers=cls._pool_size,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            cls._executor = ThreadPoolExecutor(
+                max_workers=cls._pool_size,
+                thread_name_prefix="password-hashing",
+            )
+        logger.info(f"Password hashing executor initialized: {cls._kind} x{cls._pool_size}")
+
+    @classmethod
+    def close_pool(cls) -> None:
+        """закрытие"""
+        if cls._executor:
+            cls._executor.shutdown(wait=True, cancel_futures=True)
+            cls._executor = None
+            logger.info("Password hashing executor closed")
+
+    @classmethod
+    def get_executor(cls) -> Executor:
+        if cls._executor is None:
+            raise RuntimeError(
+                "Hashing executor not initialized. Call HashingExecutor.init_pool() first"
+            )
+        return cls._executor
+
+    @classmethod
+    async def run(cls, func: Callable[..., T], *args: Any) -> T:
+        """Выполнить func в пуле, не блокируя event loop"""
+        executor = cls.get_executor()
+        loop = asyncio.get_running_loop()
+        cls._submitted += 1
+        cls._pending += 1
+        cls._max_pending = max(cls._max_pending, cls._pending)
+        try:
+            return await loop.run_in_executor(executor, func, *args)
+        except Exception:
+            cls._failed += 1
+            raise
+        finally:
+            cls._pending -= 1
+            cls._completed += 1
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Статистика пула: сколько задач выполняется и сколько ждёт в очереди"""
+        return {
+            "executor": cls._kind,
+            "pool_size": cls._pool_size,
+            "in_flight": min(cls._pending, cls._pool_size),
+            "queue_depth": max(cls._pending - cls._pool_size, 0),
+            "max_pending": cls._max_pending,
+            "submitted": cls._submitted,
+            "completed": cls._completed,
+            "failed": cls._failed,
+        }
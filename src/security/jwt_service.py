@@ -1,10 +1,71 @@
-﻿from datetime import datetime, timedelta, timezone
+﻿import logging
+import time
+import uuid
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional, Dict, Tuple
-from jose import jwt
-from jose.exceptions import JWTError, ExpiredSignatureError
 import bcrypt
 
 from src.config.settings import get_settings
+from src.security.hashers import HASHERS, HasherRegistry
+from src.security.hashing_executor import HashingExecutor
+from src.security.token_cache import VerifiedTokenCache
+from src.security.token_codec import TokenCodec, is_hmac_algorithm
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache
+def get_password_hashers() -> HasherRegistry:
+    """Реестр схем хэширования по настройкам"""
+    setting = get_settings().app
+    if setting.password_scheme not in HASHERS:
+        # argon2id — только с extra argon2 (uv sync --extra argon2)
+        raise RuntimeError(
+            f"Password scheme {setting.password_scheme} is not available, install the argon2 extra"
+        )
+    default_cls = HASHERS[setting.password_scheme]
+    default = default_cls(setting.password_hash_cost or default_cls.default_cost)
+    return HasherRegistry(
+        default,
+        [hasher_cls(hasher_cls.default_cost) for hasher_cls in HASHERS.values()],
+    )
+
+
+@lru_cache
+def get_token_codec() -> TokenCodec:
+    """Кодек токенов, собирается один раз при старте"""
+    setting = get_settings().app
+    access_ttl = setting.access_token_expire_minutes * 60
+    refresh_ttl = setting.refresh_token_expire_days * 86400
+    if is_hmac_algorithm(setting.jwt_algorithm):
+        return TokenCodec(
+            key=setting.jwt_secret_key.get_secret_value(),
+            algorithm=setting.jwt_algorithm,
+            access_ttl=access_ttl,
+            refresh_ttl=refresh_ttl,
+        )
+
+    if not setting.jwt_keys_dir or not setting.jwt_active_kid:
+        raise RuntimeError(f"{setting.jwt_algorithm} requires JWT_KEYS_DIR and JWT_ACTIVE_KID")
+    keys = {path.stem: path.read_bytes() for path in sorted(Path(setting.jwt_keys_dir).glob("*.pem"))}
+    if setting.jwt_active_kid not in keys:
+        raise RuntimeError(f"Signing key {setting.jwt_active_kid}.pem not found in {setting.jwt_keys_dir}")
+    logger.info(f"JWT signing key: {setting.jwt_active_kid}, verification keys: {sorted(keys)}")
+    return TokenCodec(
+        key=keys[setting.jwt_active_kid],
+        algorithm=setting.jwt_algorithm,
+        access_ttl=access_ttl,
+        refresh_ttl=refresh_ttl,
+        kid=setting.jwt_active_kid,
+        verify_keys=keys,
+    )
+
+
+@lru_cache
+def get_token_cache() -> VerifiedTokenCache:
+    """Кэш проверенных access токенов (на процесс)"""
+    return VerifiedTokenCache(get_settings().app.access_token_cache_size)
 
 
 class JwtService:
@@ -13,78 +74,64 @@ class JwtService:
 
     @staticmethod
     async def hash_password(password: str) -> str:
-        """Хэширует пароль с использованием bcrypt."""
-        password_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+        """Хэширует пароль схемой по умолчанию (в пуле HashingExecutor)."""
+        hasher = get_password_hashers().default
+        return await HashingExecutor.run(hasher.hash, password)
 
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Проверяет соответствие пароля хэшу."""
-        password_bytes = plain_password.encode('utf-8')
-        hashed_bytes = hashed_password.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hashed_bytes)
+    async def verify_password(plain_password: str, hashed_password: str) -> bool:
+        """Проверяет пароль схемой, определённой по префиксу хэша (в пуле HashingExecutor)."""
+        hasher = get_password_hashers().identify(hashed_password)
+        if hasher is None:
+            logger.error("Unknown password hash scheme")
+            return False
+        return await HashingExecutor.run(hasher.verify, plain_password, hashed_password)
 
     @staticmethod
-    def create_access_token(user_id: int) -> str:
-        """Создаёт access token с коротким сроком жизни."""
-        expire = datetime.now(timezone.utc) + timedelta(
-            minutes=get_settings().app.access_token_expire_minutes
-        )
+    def needs_rehash(hashed_password: str) -> bool:
+        """Хэш посчитан устаревшей схемой или стоимостью"""
+        return get_password_hashers().needs_rehash(hashed_password)
+
+    @staticmethod
+    def create_access_token(user_id: int, role: str, token_version: int) -> str:
+        """Создаёт access token с коротким сроком жизни.
+
+        role и ver позволяют аутентифицировать запрос без обращения к БД.
+        """
+        codec = get_token_codec()
         payload = {
             "sub": str(user_id),
-            "exp": expire,
-            "type": "access"
+            "exp": int(time.time()) + codec.access_ttl,
+            "type": "access",
+            "role": role,
+            "ver": token_version,
         }
-        return jwt.encode(
-            payload,
-            get_settings().app.jwt_secret_key.get_secret_value(),
-            algorithm=get_settings().app.jwt_algorithm
-        )
+        return codec.encode(payload)
 
     @staticmethod
     def decode_token(token: str) -> Optional[Dict]:
         """Декодирует и валидирует токен. Возвращает None если токен невалидный."""
-        try:
-            payload = jwt.decode(
-                token,
-                get_settings().app.jwt_secret_key.get_secret_value(),
-                algorithms=[get_settings().app.jwt_algorithm]
-            )
-            return payload
-        except JWTError:
-            return None
-
-    def create_access_token_response(self, user_id: int) -> tuple[str, int]:
+        return get_token_codec().decode(token)
+
+    @staticmethod
+    def decode_token_cached(token: str) -> Optional[Dict]:
+        """То же, что decode_token, но повторно пришедший токен берётся из кэша без проверки подписи."""
+        return get_token_cache().get_or_decode(token, get_token_codec().decode)
+
+    def create_access_token_response(self, user_id: int, role: str, token_version: int) -> tuple[str, int]:
         """Возвращает токен и время жизни в секундах"""
-        expire_minutes = get_settings().app.access_token_expire_minutes
-        expire = datetime.now(timezone.utc) + timedelta(minutes=expire_minutes)
-        payload = {
-            "sub": str(user_id),
-            "exp": expire,
-            "type": "access"
-        }
-        token = jwt.encode(
-            payload,
-            get_settings().app.jwt_secret_key.get_secret_value(),
-            algorithm=get_settings().app.jwt_algorithm
-        )
-        return token, int(expire_minutes * 60)
+        return self.create_access_token(user_id, role, token_version), get_token_codec().access_ttl
 
     def create_refresh_token(self, user_id: int) -> Tuple[str, int]:
-        expire_days = get_settings().app.refresh_token_expire_days
-        expire = datetime.now(timezone.utc) + timedelta(days=expire_days)
+        codec = get_token_codec()
         payload = {
             "sub": str(user_id),
-            "exp": expire,
-            "type": "refresh"
+            "exp": int(time.time()) + codec.refresh_ttl,
+            "type": "refresh",
+            # без jti два токена, выданные в одну секунду, совпали бы
+            "jti": uuid.uuid4().hex,
         }
-        token = jwt.encode(
-            payload,
-            get_settings().app.jwt_secret_key.get_secret_value(),
-            algorithm=get_settings().app.jwt_algorithm
-        )
-        return token, int(expire_days * 86400)
+        return codec.encode(payload), codec.refresh_ttl
 
     @staticmethod
     def hash_refresh_token(token: str) -> str:
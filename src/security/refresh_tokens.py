@@ -0,0 +1,154 @@
+import logging
+import time
+
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshTokenStore:
+    """Выданные refresh токены в Redis: refresh:<token> -> user_id.
+
+    Сессии пользователя индексируются в sessions:<user_id> (ZSET ключей
+    refresh:<token> по времени истечения) — отзыв всех сессий и лимит на
+    их число без SCAN. Счёт строго растёт в порядке выдачи: при равном
+    времени он на 1 ms больше последнего, иначе порядок одинаковых счётов
+    задавало бы имя токена. Каждая операция — один Lua-скрипт, поэтому ротация,
+    выход и отзыв атомарны относительно друг друга. Скрипты отзыва строят
+    ключи refresh:* внутри себя — рассчитано на Redis без кластера.
+    """
+
+    # добавить токен в ZSET сессий (sessions, token, expires) со счётом больше всех прежних
+    _ADD_SESSION = """
+    local function add_session(sessions, token, expires)
+        local score = tonumber(expires)
+        local last = redis.call('ZRANGE', sessions, -1, -1, 'WITHSCORES')
+        if last[2] and tonumber(last[2]) >= score then
+            score = tonumber(last[2]) + 0.001
+        end
+        redis.call('ZADD', sessions, score, token)
+    end
+    """
+
+    # KEYS: новый токен, сессии; ARGV: user_id, TTL, сейчас, истекает, лимит сессий.
+    # Возвращает число вытесненных старейших сессий; новая сессия не вытесняется
+    _ISSUE = _ADD_SESSION + """
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', ARGV[3])
+    add_session(KEYS[2], KEYS[1], ARGV[4])
+    redis.call('EXPIRE', KEYS[2], ARGV[2])
+    local limit = tonumber(ARGV[5])
+    if limit <= 0 then
+        return 0
+    end
+    local excess = redis.call('ZCARD', KEYS[2]) - limit
+    if excess <= 0 then
+        return 0
+    end
+    local evicted = 0
+    for _, key in ipairs(redis.call('ZRANGE', KEYS[2], 0, excess)) do
+        if evicted < excess and key ~= KEYS[1] then
+            redis.call('DEL', key)
+            redis.call('ZREM', KEYS[2], key)
+            evicted = evicted + 1
+        end
+    end
+    return evicted
+    """
+
+    # KEYS: старый, новый, сессии; ARGV: user_id из токена, TTL нового, истекает.
+    # 1 — ротирован, 0 — старого нет (истёк / уже использован / отозван), -1 — чужой user_id
+    _ROTATE = _ADD_SESSION + """
+    local stored = redis.call('GET', KEYS[1])
+    redis.call('ZREM', KEYS[3], KEYS[1])
+    if not stored then
+        return 0
+    end
+    redis.call('DEL', KEYS[1])
+    if stored ~= ARGV[1] then
+        return -1
+    end
+    redis.call('SET', KEYS[2], ARGV[1], 'EX', ARGV[2])
+    add_session(KEYS[3], KEYS[2], ARGV[3])
+    redis.call('EXPIRE', KEYS[3], ARGV[2])
+    return 1
+    """
+
+    # KEYS: токен
+    _REVOKE = """
+    local user_id = redis.call('GET', KEYS[1])
+    if not user_id then
+        return 0
+    end
+    redis.call('DEL', KEYS[1])
+    redis.call('ZREM', 'sessions:' .. user_id, KEYS[1])
+    return 1
+    """
+
+    # KEYS: сессии пользователей. Возвращает число отозванных токенов
+    _REVOKE_ALL = """
+    local revoked = 0
+    for _, sessions in ipairs(KEYS) do
+        for _, key in ipairs(redis.call('ZRANGE', sessions, 0, -1)) do
+            revoked = revoked + redis.call('DEL', key)
+        end
+        redis.call('DEL', sessions)
+    end
+    return revoked
+    """
+
+    # пользователей на один вызов _REVOKE_ALL: пока скрипт выполняется, Redis занят
+    BATCH_SIZE = 500
+
+    def __init__(self, redis: Redis, max_sessions: int = 0):
+        self.redis = redis
+        self.max_sessions = max_sessions
+        self._issue = redis.register_script(self._ISSUE)
+        self._rotate = redis.register_script(self._ROTATE)
+        self._revoke = redis.register_script(self._REVOKE)
+        self._revoke_all = redis.register_script(self._REVOKE_ALL)
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return f"refresh:{token}"
+
+    @staticmethod
+    def _sessions_key(user_id: int) -> str:
+        return f"sessions:{user_id}"
+
+    async def issue(self, user_id: int, token: str, ttl: int) -> int:
+        """Сохранить новую сессию; сверх max_sessions вытесняются самые старые"""
+        now = round(time.time(), 3)
+        evicted = await self._issue(
+            keys=[self._key(token), self._sessions_key(user_id)],
+            args=[str(user_id), ttl, now, now + ttl, self.max_sessions],
+        )
+        if evicted:
+            logger.info(f"Evicted {evicted} oldest sessions of user {user_id}")
+        return evicted
+
+    async def rotate(self, old_token: str, new_token: str, user_id: int, ttl: int) -> bool:
+        """Заменить старый токен новым за один запрос в Redis"""
+        result = await self._rotate(
+            keys=[self._key(old_token), self._key(new_token), self._sessions_key(user_id)],
+            args=[str(user_id), ttl, round(time.time() + ttl, 3)],
+        )
+        if result == -1:
+            logger.warning(f"Refresh token user mismatch for user {user_id}")
+        return result == 1
+
+    async def revoke(self, token: str) -> None:
+        """Выход из одной сессии"""
+        await self._revoke(keys=[self._key(token)])
+
+    async def revoke_all(self, user_id: int) -> int:
+        """Выход из всех сессий пользователя"""
+        return await self.revoke_all_many([user_id])
+
+    async def revoke_all_many(self, user_ids: list[int]) -> int:
+        """Отозвать все сессии сразу многих пользователей, по BATCH_SIZE за скрипт"""
+        revoked = 0
+        for start in range(0, len(user_ids), self.BATCH_SIZE):
+            batch = user_ids[start:start + self.BATCH_SIZE]
+            revoked += await self._revoke_all(keys=[self._sessions_key(user_id) for user_id in batch])
+        return revoked
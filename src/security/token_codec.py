@@ -0,0 +1,136 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+
+import jwt as pyjwt
+
+_HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+def b64url_encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def b64url_decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def is_hmac_algorithm(algorithm: str) -> bool:
+    return algorithm in _HMAC_DIGESTS
+
+
+class TokenCodec:
+    """Кодирование и проверка JWT с заранее подготовленными ключами и заголовком.
+
+    HS256/384/512: подпись считается напрямую через hmac (копия подготовленного
+    объекта на каждый токен).
+    ES256/EdDSA и прочие асимметричные: подпись активным ключом (kid в заголовке),
+    проверка — любым из опубликованных ключей, что позволяет ротацию без простоя.
+    Ключи разбираются один раз через алгоритмы PyJWT.
+    """
+
+    def __init__(
+            self,
+            key: str | bytes,
+            algorithm: str,
+            access_ttl: int,
+            refresh_ttl: int,
+            kid: str | None = None,
+            verify_keys: dict[str, str | bytes] | None = None,
+    ):
+        self.algorithm = algorithm
+        self.access_ttl = access_ttl
+        self.refresh_ttl = refresh_ttl
+        self.kid = kid
+
+        header = {"alg": algorithm, "typ": "JWT"}
+        if kid:
+            header["kid"] = kid
+        self._header_segment = b64url_encode(json.dumps(header, separators=(",", ":")).encode())
+
+        digest = _HMAC_DIGESTS.get(algorithm)
+        if digest is not None:
+            secret = key.encode() if isinstance(key, str) else key
+            self._mac = hmac.new(secret, digestmod=digest)
+            self._signer = None
+            self._verify_keys = {}
+        else:
+            self._mac = None
+            self._signer = pyjwt.get_algorithm_by_name(algorithm)
+            self._key = self._signer.prepare_key(key)
+            self._verify_keys = {kid: self._key.public_key()}
+            for verify_kid, verify_key in (verify_keys or {}).items():
+                prepared = self._signer.prepare_key(verify_key)
+                if hasattr(prepared, "private_bytes"):
+                    prepared = prepared.public_key()
+                self._verify_keys.setdefault(verify_kid, prepared)
+        self._jwks = json.dumps(self._build_jwks(), separators=(",", ":")).encode()
+
+    def _sign(self, signing_input: bytes) -> bytes:
+        if self._mac is None:
+            return self._signer.sign(signing_input, self._key)
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def _verify(self, header_segment: bytes, signing_input: bytes, signature: bytes) -> bool:
+        if header_segment == self._header_segment:
+            header = None
+        else:
+            header = json.loads(b64url_decode(header_segment))
+            # валидный JSON, но не объект ([1], "x") — не JWT
+            if not isinstance(header, dict) or header.get("alg") != self.algorithm:
+                return False
+
+        if self._mac is not None:
+            return hmac.compare_digest(self._sign(signing_input), signature)
+
+        kid = self.kid if header is None else header.get("kid")
+        key = self._verify_keys.get(kid)
+        if key is None:
+            return False
+        return self._signer.verify(signing_input, key, signature)
+
+    def encode(self, payload: dict) -> str:
+        """payload должен содержать только JSON-совместимые значения (exp — int)"""
+        payload_segment = b64url_encode(json.dumps(payload, separators=(",", ":")).encode())
+        signing_input = self._header_segment + b"." + payload_segment
+        return (signing_input + b"." + b64url_encode(self._sign(signing_input))).decode()
+
+    def decode(self, token: str) -> dict | None:
+        """Проверяет подпись и exp. Возвращает None если токен невалидный."""
+        try:
+            raw = token.encode()
+            signing_input, signature_segment = raw.rsplit(b".", 1)
+            header_segment, payload_segment = signing_input.split(b".")
+            if not self._verify(header_segment, signing_input, b64url_decode(signature_segment)):
+                return None
+            payload = json.loads(b64url_decode(payload_segment))
+        except (ValueError, TypeError, UnicodeError):
+            return None
+        if not isinstance(payload, dict):
+            return None
+        exp = payload.get("exp")
+        if exp is not None and (not isinstance(exp, (int, float)) or exp <= time.time()):
+            return None
+        return payload
+
+    def _build_jwks(self) -> dict:
+        keys = []
+        if self._signer is not None:
+            for kid, key in self._verify_keys.items():
+                jwk = self._signer.to_jwk(key, as_dict=True)
+                jwk.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+                keys.append(jwk)
+        return {"keys": keys}
+
+    @property
+    def jwks(self) -> bytes:
+        """JWKS с публичными ключами (для HMAC — пустой, секрет не публикуется)"""
+        return self._jwks
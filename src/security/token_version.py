@@ -0,0 +1,66 @@
+from redis.asyncio import Redis
+
+from src.cache.invalidation import CacheInvalidator
+from src.cache.local_cache import LocalCache
+
+
+class TokenVersionStore:
+    """Версия токенов пользователя в Redis.
+
+    Версия зашита в access token (claim ver). Увеличение версии отзывает
+    все ранее выданные access токены пользователя. Прочитанные версии
+    держатся в L1 процесса; bump публикует новую версию через pub/sub.
+    Версия в L1 только растёт: прочитанное из Redis до INCR значение не
+    затрёт уже известную новую версию.
+    """
+
+    # INCR всех ключей одной командой вместо тысяч команд в pipeline
+    _INCR_MANY = """
+    local versions = {}
+    for i, key in ipairs(KEYS) do
+        versions[i] = redis.call('INCR', key)
+    end
+    return versions
+    """
+
+    # пользователей на один вызов _INCR_MANY: пока скрипт выполняется, Redis занят
+    BATCH_SIZE = 500
+
+    def __init__(self, redis: Redis, local: LocalCache | None = None):
+        self.redis = redis
+        self.local = local
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"token_version:{user_id}"
+
+    async def get(self, user_id: int) -> int:
+        if self.local is not None:
+            version = self.local.get(user_id)
+            if version is not None:
+                return version
+        value = await self.redis.get(self._key(user_id))
+        version = int(value) if value else 0
+        if self.local is not None:
+            self.local.set_max(user_id, version)
+        return version
+
+    async def bump(self, user_id: int) -> int:
+        """Отозвать все access токены пользователя"""
+        version = await self.redis.incr(self._key(user_id))
+        await CacheInvalidator.publish_versions(self.redis, {user_id: version})
+        return version
+
+    async def bump_many(self, user_ids: list[int]) -> None:
+        """Отозвать access токены сразу многих пользователей одним pipeline, по BATCH_SIZE за скрипт"""
+        if not user_ids:
+            return
+        batches = [user_ids[start:start + self.BATCH_SIZE] for start in range(0, len(user_ids), self.BATCH_SIZE)]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for batch in batches:
+                pipe.eval(self._INCR_MANY, len(batch), *(self._key(user_id) for user_id in batch))
+            results = await pipe.execute()
+            # публикуем только после INCR, вместе с новыми версиями
+            for batch, versions in zip(batches, results):
+                CacheInvalidator.publish_versions(pipe, dict(zip(batch, versions)))
+            await pipe.execute()
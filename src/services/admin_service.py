@@ -1,15 +1,59 @@
-﻿from src.exceptions.custom_exceptions import AlreadyExistsException
+﻿from src.exceptions.custom_exceptions import NotFoundException, RequestValidationException
 from src.repositories.user_repository import UserRepository
-from src.schemes.schemes import UserResponse
+from src.Models.User import User
+from src.schemes.schemes import UserResponse, BulkUserAction, BulkActionResult, BULK_MAX_USERS
+from src.security.refresh_tokens import RefreshTokenStore
+from src.security.token_version import TokenVersionStore
 
 
 class AdminService:
-    def __init__(self, repository: UserRepository):
+    def __init__(
+            self,
+            repository: UserRepository,
+            token_versions: TokenVersionStore,
+            refresh_tokens: RefreshTokenStore,
+    ):
         self.repository = repository
+        self.token_versions = token_versions
+        self.refresh_tokens = refresh_tokens
 
     async def updating_role(self, user_id: int, role: str) -> UserResponse:
-        user = await self.repository.find_by_id(user_id)
-        if not user:
-            raise AlreadyExistsException("User not fount by id")
-        updated_user = await self.repository.update(user.id, {"role": role})
+        updated_user = await self.repository.update(user_id, {"role": role})
+        if updated_user is None:
+            raise NotFoundException("User not found by id")
+        # роль зашита в access token — старые токены отзываются. Версия растёт только
+        # после commit: иначе параллельный refresh успеет выдать токен с новой версией,
+        # но со старой ролью из ещё не закоммиченной строки
+        self.repository.after_commit(lambda: self.token_versions.bump(user_id))
+        await self.refresh_tokens.revoke_all(user_id)
         return UserResponse.model_validate(updated_user)
+
+    async def bulk_action(self, data: BulkUserAction, admin_id: int) -> BulkActionResult:
+        """Массовая операция одним UPDATE; свой аккаунт админ так не меняет"""
+        if data.action == "set_role":
+            values = {"role": data.role}
+        else:
+            values = {"is_active": data.action == "reactivate"}
+        conditions = User.get_cond_list(**data.filter.model_dump()) if data.filter else ()
+        # по фильтру — не больше BULK_MAX_USERS строк, как и по списку id: лишняя строка
+        # означает слишком широкий фильтр, UPDATE откатывается вместе с запросом
+        limit = BULK_MAX_USERS + 1 if data.ids is None else None
+        rows = await self.repository.bulk_update(
+            values, ids=data.ids, conditions=conditions, exclude_id=admin_id, limit=limit,
+        )
+        if len(rows) > BULK_MAX_USERS:
+            raise RequestValidationException(f"Filter matches more than {BULK_MAX_USERS} users, narrow it down")
+        updated = [user_id for user_id, _ in rows]
+        # роль и активность проверяются по версии токена — старые access токены и сессии
+        # отзываются; версии растут после commit, как в updating_role
+        if data.action != "reactivate" and updated:
+            self.repository.after_commit(lambda: self.token_versions.bump_many(updated))
+            await self.refresh_tokens.revoke_all_many(updated)
+
+        results = {user_id: "updated" for user_id in updated}
+        for user_id in data.ids or ():
+            if user_id == admin_id:
+                results[user_id] = "skipped"
+            else:
+                results.setdefault(user_id, "not_found")
+        return BulkActionResult(action=data.action, updated=len(updated), results=results)
@@ -2,7 +2,6 @@
 from typing import List
 
 from fastapi import HTTPException, Request, Response
-from redis.asyncio import Redis
 
 from src.config.settings import get_settings
 from src.schemes.schemes import (
@@ -11,18 +10,30 @@ from src.schemes.schemes import (
 from src.exceptions.custom_exceptions import (
     NotFoundException, AlreadyExistsException, ServiceError, InvalidCredentialsException
 )
+from src.security.admission import AdmissionController
+from src.security.current_user import CurrentUser
 from src.security.jwt_service import JwtService
+from src.security.refresh_tokens import RefreshTokenStore
+from src.security.token_version import TokenVersionStore
 from src.repositories.user_repository import UserRepository
-from src.Models.User import User
 
 logger = logging.getLogger(__name__)
 
 
 class AuthService:
-    def __init__(self, repository: UserRepository, jwt_service: JwtService, redis: Redis):
+    def __init__(
+            self,
+            repository: UserRepository,
+            jwt_service: JwtService,
+            refresh_tokens: RefreshTokenStore,
+            admission: AdmissionController,
+            token_versions: TokenVersionStore,
+    ):
         self.repository = repository
         self.jwt_service = jwt_service
-        self.redis = redis
+        self.refresh_tokens = refresh_tokens
+        self.admission = admission
+        self.token_versions = token_versions
 
     def _set_cookie(self, response: Response, key: str, value: str, max_age) -> None:
         response.set_cookie(
@@ -36,18 +47,26 @@ class AuthService:
         )
     async def login(self, data: LoginRequest, response: Response) -> UserResponse:
         """Вход по емайлу и паролю, возвращает пользователя"""
-        user = await self.repository.find_one_or_none({"email": data.email})
+        user = await self.repository.find_with_password(data.email)
         if not user:
             raise NotFoundException(detail="User not found by email")
-        if not self.jwt_service.verify_password(data.password, user.hash_password):
+        new_hash = None
+        async with self.admission.admit():
+            is_valid = await self.jwt_service.verify_password(data.password, user.hash_password)
+            if is_valid and self.jwt_service.needs_rehash(user.hash_password):
+                new_hash = await self.jwt_service.hash_password(data.password)
+        if not is_valid:
             raise InvalidCredentialsException(detail="Wrong password")
         if not user.is_active:
             raise InvalidCredentialsException(detail="User account is disabled")
-        access_token = self.jwt_service.create_access_token(user.id)
+        if new_hash:
+            # пароль известен только сейчас — пересчитываем хэш по актуальной схеме
+            await self.repository.update(user.id, {"hash_password": new_hash})
+            logger.info(f"Password hash upgraded for user {user.id}")
+        token_version = await self.token_versions.get(user.id)
+        access_token = self.jwt_service.create_access_token(user.id, user.role, token_version)
         refresh_token, refresh_ttl_sec = self.jwt_service.create_refresh_token(user.id)  # ← используй tuple
-
-        redis_key = f"refresh:{refresh_token}"
-        await self.redis.set(redis_key, str(user.id), ex=refresh_ttl_sec)
+        await self.refresh_tokens.issue(user.id, refresh_token, refresh_ttl_sec)
 
         # Куки access
         access_max_age_sec = get_settings().app.access_token_expire_minutes * 60
@@ -60,24 +79,26 @@ class AuthService:
 
 
     async def register(self, data: Registration, response) -> UserResponse:
-        """Регистрация нового пользователя"""
-        exist_user = await self.repository.find_one_or_none({"email": data.email})
-        if exist_user:
-            raise AlreadyExistsException(detail="Email already registered")
-        hash_password = await self.jwt_service.hash_password(data.password)
+        """Регистрация нового пользователя.
+
+        Занятость email проверяет сам INSERT (ON CONFLICT), отдельного SELECT нет.
+        """
+        async with self.admission.admit():
+            hash_password = await self.jwt_service.hash_password(data.password)
         user_data = {
             "first_name": data.first_name,
             "last_name": data.last_name,
             "email": data.email,
             "hash_password": hash_password
         }
-        new_user = await self.repository.add(user_data)
+        new_user = await self.repository.add_if_absent(user_data)
+        if new_user is None:
+            raise AlreadyExistsException(detail="Email already registered")
 
-        access_token = self.jwt_service.create_access_token(new_user.id)
+        token_version = await self.token_versions.get(new_user.id)
+        access_token = self.jwt_service.create_access_token(new_user.id, new_user.role, token_version)
         refresh_token, refresh_ttl_sec = self.jwt_service.create_refresh_token(new_user.id)
-
-        redis_key = f"refresh:{refresh_token}"
-        await self.redis.set(redis_key, str(new_user.id), ex=refresh_ttl_sec)
+        await self.refresh_tokens.issue(new_user.id, refresh_token, refresh_ttl_sec)
 
         access_max_age_sec = get_settings().app.access_token_expire_minutes * 60
         self._set_cookie(response, "access_token", access_token, access_max_age_sec)
@@ -85,59 +106,69 @@ class AuthService:
         self._set_cookie(response, "refresh_token", refresh_token, refresh_ttl_sec)
 
         return UserResponse.model_validate(new_user)
-    async def get_me(self, user: User) -> UserResponse:
+    async def get_me(self, current_user: CurrentUser) -> UserResponse:
         """"""
-        return UserResponse.model_validate(user)
+        return UserResponse.model_validate(await current_user.load())
 
-    async def update_profile(self, user: User, data: UpdateUser) -> UserResponse:
+    async def update_profile(self, current_user: CurrentUser, data: UpdateUser) -> UserResponse:
         """Обновление профиля пользователя (частичное обновление)"""
-        print("1")
-        if data.email and data.email != user.email:
+        if data.email:
             existing = await self.repository.find_one_or_none({"email": data.email})
-            if existing:
+            if existing and existing.id != current_user.id:
                 raise AlreadyExistsException(detail="Email already in use")
         update_data = data.model_dump(exclude_none=True)
-        print(update_data)
+        logger.debug(f"Profile update of user {current_user.id}: fields {sorted(update_data)}")
         if not update_data:
             raise NotFoundException("No data to update")
-        update_user = await self.repository.update(user.id, update_data)
-        updated_user = UserResponse.model_validate(update_user)
+        updated_user = await self.repository.update(current_user.id, update_data)
+        if updated_user is None:
+            raise InvalidCredentialsException(detail="User not found or inactive")
         return UserResponse.model_validate(updated_user)
 
-    async def delete_user(self, user: User) -> dict:
+    async def delete_user(self, current_user: CurrentUser) -> dict:
         """Удаление пользователя (soft delete - устанавливаем is_active=False)"""
-        await self.repository.update(user.id, {"is_active": False})
+        if await self.repository.update(current_user.id, {"is_active": False}) is None:
+            raise InvalidCredentialsException(detail="User not found or inactive")
+        # после commit — см. AdminService.updating_role
+        self.repository.after_commit(lambda: self.token_versions.bump(current_user.id))
+        await self.refresh_tokens.revoke_all(current_user.id)
         return {"message": "User account deleted successfully"}
 
+    async def logout_all(self, current_user: CurrentUser) -> dict:
+        """Выход на всех устройствах: отзыв всех refresh сессий и access токенов"""
+        revoked = await self.refresh_tokens.revoke_all(current_user.id)
+        await self.token_versions.bump(current_user.id)
+        return {"message": "Вы вышли из аккаунта на всех устройствах", "sessions_revoked": revoked}
+
     async def refresh_token(self, request: Request, response: Response) -> UserResponse:
+        """Ротация refresh токена.
+
+        user_id берётся из подписи токена, сама ротация (проверка, удаление
+        старого, запись нового) — один атомарный запрос в Redis.
+        """
         refresh_token = request.cookies.get("refresh_token")
         if not refresh_token:
             raise InvalidCredentialsException("Нет refresh токена в cookie")
 
-        redis_key = f"refresh:{refresh_token}"
-        user_id_str = await self.redis.get(redis_key)
-        print(user_id_str)
-        if not user_id_str:
+        payload = self.jwt_service.decode_token(refresh_token)
+        if not payload or payload.get("type") != "refresh":
             raise InvalidCredentialsException("Refresh недействителен или истёк")
-
         try:
-            user_id = int(user_id_str)
-        except ValueError:
-            await self.redis.delete(redis_key)
-            raise InvalidCredentialsException("Повреждённые данные в Redis")
+            user_id = int(payload["sub"])
+        except (ValueError, KeyError, TypeError):
+            raise InvalidCredentialsException("Refresh недействителен или истёк")
 
-        user = await self.repository.find_by_id(user_id)
+        new_refresh, new_ttl_sec = self.jwt_service.create_refresh_token(user_id)
+        if not await self.refresh_tokens.rotate(refresh_token, new_refresh, user_id, new_ttl_sec):
+            raise InvalidCredentialsException("Refresh недействителен или истёк")
+
+        user = await self.repository.find_for_token(user_id)
         if not user or not user.is_active:
-            await self.redis.delete(redis_key)
+            await self.refresh_tokens.revoke(new_refresh)
             raise InvalidCredentialsException("Пользователь не найден / заблокирован")
 
-        # Ротация
-        await self.redis.delete(redis_key)
-
-        new_access = self.jwt_service.create_access_token(user.id)
-        new_refresh, new_ttl_sec = self.jwt_service.create_refresh_token(user.id)
-
-        await self.redis.set(f"refresh:{new_refresh}", str(user.id), ex=new_ttl_sec)
+        token_version = await self.token_versions.get(user.id)
+        new_access = self.jwt_service.create_access_token(user.id, user.role, token_version)
 
         access_max_age_sec = get_settings().app.access_token_expire_minutes * 60
         self._set_cookie(response, "access_token", new_access, access_max_age_sec)
@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Literal, Sequence
+
+from sqlalchemy import Row
+
+from src.Models.User import User
+from src.config.core import local_session
+from src.schemes.pagination_filter import PaginationFilter
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_FIELDS = ("id", "email", "first_name", "last_name", "is_active", "role", "created_at")
+# строк за один fetch из серверного курсора и в одном куске ответа
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+# с этих символов Excel / LibreOffice начинают формулу — такие ячейки экранируются "'"
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _ndjson(rows: Sequence[Row]) -> str:
+    lines = []
+    for row in rows:
+        values = [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        lines.append(json.dumps(dict(zip(EXPORT_FIELDS, values)), ensure_ascii=False))
+    return "\n".join(lines) + "\n"
+
+
+def _csv_cell(value):
+    if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv(rows: Sequence[Row] | None = None) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if rows is None:
+        writer.writerow(EXPORT_FIELDS)
+    else:
+        writer.writerows([_csv_cell(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+async def export_users(filter_params: PaginationFilter, fmt: ExportFormat, use_replica: bool = True) -> AsyncIterator[str]:
+    """Выгрузка пользователей потоком через серверный курсор.
+
+    Сессия живёт, пока отдаётся ответ, поэтому открывается здесь, а не через
+    get_session. В памяти одновременно не больше EXPORT_BATCH_SIZE строк.
+    """
+    statement = User.get_filter_statement(filter_params._replace(page=None, size=None))
+    statement = statement.with_only_columns(*(getattr(User, field) for field in EXPORT_FIELDS))
+    async with local_session() as session:
+        session.info["use_replica"] = use_replica
+        result = await session.stream(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        if fmt == "csv":
+            yield _csv()
+        async for rows in result.partitions():
+            yield _csv(rows) if fmt == "csv" else _ndjson(rows)
@@ -0,0 +1,24 @@
+import pytest
+from pydantic import ValidationError
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db_engine():
+    """Движок приложения (настройки из .env / окружения); без БД тест пропускается"""
+    try:
+        from src.config.core import engine
+    except ValidationError:
+        pytest.skip("нет настроек БД (.env)")
+    try:
+        async with engine.connect():
+            pass
+    except OSError as e:
+        pytest.skip(f"PostgreSQL недоступен: {e}")
+    yield engine
+    # соединения пула привязаны к event loop теста
+    await engine.dispose()
@@ -0,0 +1,82 @@
+import uuid
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from starlette.requests import Request
+from starlette.responses import Response
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def service_factory(db_engine):
+    from src.repositories.user_repository import UserRepository
+    from src.security.refresh_tokens import RefreshTokenStore
+    from src.security.token_version import TokenVersionStore
+    from src.services.admin_service import AdminService
+
+    redis = FakeAsyncRedis(decode_responses=True)
+
+    def factory(session) -> AdminService:
+        return AdminService(UserRepository(session), TokenVersionStore(redis), RefreshTokenStore(redis))
+
+    yield factory
+    await redis.aclose()
+
+
+@pytest.fixture
+async def users(db_engine):
+    from sqlalchemy import delete, insert
+
+    from src.Models.User import User
+
+    prefix = f"bulk-{uuid.uuid4().hex[:12]}-"
+    async with db_engine.begin() as connection:
+        await connection.execute(insert(User), [
+            {"email": f"{prefix}{i}@example.com", "first_name": "Bulk", "last_name": "User", "hash_password": "x"}
+            for i in range(3)
+        ])
+    yield prefix
+    async with db_engine.begin() as connection:
+        await connection.execute(delete(User).where(User.email.startswith(prefix)))
+
+
+async def bulk_deactivate(service_factory, prefix: str):
+    from src.di.dependencies import get_session
+    from src.schemes.schemes import BulkUserAction
+
+    data = BulkUserAction(action="deactivate", filter={"search": prefix})
+    sessions = get_session(Request({"type": "http", "headers": []}), Response())
+    service = service_factory(await anext(sessions))
+    try:
+        result = await service.bulk_action(data, admin_id=0)
+    except Exception as e:
+        await sessions.athrow(e)
+    with pytest.raises(StopAsyncIteration):
+        await anext(sessions)
+    return result
+
+
+async def active_count(db_engine, prefix: str) -> int:
+    from sqlalchemy import func, select
+
+    from src.Models.User import User
+
+    async with db_engine.connect() as connection:
+        return await connection.scalar(
+            select(func.count()).where(User.email.startswith(prefix), User.is_active)
+        )
+
+
+async def test_filter_matching_more_than_limit_is_rejected(db_engine, service_factory, users, monkeypatch):
+    from src.exceptions.custom_exceptions import RequestValidationException
+    from src.services import admin_service
+
+    monkeypatch.setattr(admin_service, "BULK_MAX_USERS", 2)
+    with pytest.raises(RequestValidationException):
+        await bulk_deactivate(service_factory, users)
+    assert await active_count(db_engine, users) == 3
+
+    monkeypatch.setattr(admin_service, "BULK_MAX_USERS", 3)
+    assert (await bulk_deactivate(service_factory, users)).updated == 3
+    assert await active_count(db_engine, users) == 0
@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import select
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("search", ["ab :xyz", "a:b", "100%", "it's", "$1", "back\\slash"])
+@pytest.mark.parametrize("mode", ["prefix", "contains"])
+async def test_estimated_count_with_special_characters_in_search(db_engine, search, mode):
+    from src.Models.User import User
+    from src.config.core import local_session
+    from src.schemes.counting import estimated_count
+
+    statement = select(User).where(*User.get_cond_list(email=None, search=search, search_mode=mode))
+    async with local_session() as session:
+        assert await estimated_count(session, statement) >= 0
+
+
+async def test_estimated_count_sends_pattern_without_doubled_percents(db_engine, monkeypatch):
+    from sqlalchemy.ext.asyncio import AsyncConnection
+
+    from src.Models.User import User
+    from src.config.core import local_session
+    from src.schemes.counting import estimated_count
+
+    sent = []
+    exec_driver_sql = AsyncConnection.exec_driver_sql
+
+    async def record(self, statement, *args, **kwargs):
+        sent.append(statement)
+        return await exec_driver_sql(self, statement, *args, **kwargs)
+
+    monkeypatch.setattr(AsyncConnection, "exec_driver_sql", record)
+    statement = select(User).where(User.email == "a%b@example.com")
+    async with local_session() as session:
+        await estimated_count(session, statement)
+    assert "'a%b@example.com'" in sent[0]
@@ -0,0 +1,190 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import struct
+
+import pytest
+from sqlalchemy import exc, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+pytestmark = pytest.mark.anyio
+
+SSL_REQUEST = 80877103
+GSSENC_REQUEST = 80877104
+
+
+async def read_startup(reader: asyncio.StreamReader) -> bytes | None:
+    """StartupMessage клиента; b"N" — запрос SSL/GSS, None — CancelRequest"""
+    length = struct.unpack("!I", await reader.readexactly(4))[0]
+    body = await reader.readexactly(length - 4)
+    code = struct.unpack("!I", body[:4])[0]
+    if code in (SSL_REQUEST, GSSENC_REQUEST):
+        return b"N"
+    if code >> 16 != 3:
+        return None
+    return struct.pack("!I", length) + body
+
+
+async def read_message(reader: asyncio.StreamReader) -> tuple[bytes, bytes]:
+    kind = await reader.readexactly(1)
+    length = struct.unpack("!I", await reader.readexactly(4))[0]
+    return kind, await reader.readexactly(length - 4)
+
+
+def pack(kind: bytes, body: bytes) -> bytes:
+    return kind + struct.pack("!I", len(body) + 4) + body
+
+
+def scram_proof(password: str, client_first_bare: str, server_first: str) -> str:
+    """client-final-message SCRAM-SHA-256 (RFC 5802) без channel binding"""
+    attrs = dict(item.split("=", 1) for item in server_first.split(","))
+    salted = hashlib.pbkdf2_hmac("sha256", password.encode(), base64.b64decode(attrs["s"]), int(attrs["i"]))
+    client_key = hmac.digest(salted, b"Client Key", "sha256")
+    without_proof = f"c=biws,r={attrs['r']}"
+    auth_message = f"{client_first_bare},{server_first},{without_proof}".encode()
+    signature = hmac.digest(hashlib.sha256(client_key).digest(), auth_message, "sha256")
+    proof = bytes(a ^ b for a, b in zip(client_key, signature))
+    return f"{without_proof},p={base64.b64encode(proof).decode()}"
+
+
+class ServerConnection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.owner: asyncio.StreamWriter | None = None
+
+
+class TransactionPoolProxy:
+    """Заменитель PgBouncer в transaction mode.
+
+    Несколько серверных соединений делятся между клиентами: соединение
+    закрепляется за клиентом до ReadyForQuery вне транзакции ('I') и
+    возвращается в конец очереди, так что следующая транзакция клиента
+    попадает на другое серверное соединение. Пароль клиентов не проверяется.
+    """
+
+    def __init__(self, url, pool_size: int = 2):
+        self.url = url
+        self.pool_size = pool_size
+        self.idle: asyncio.Queue[ServerConnection] = asyncio.Queue()
+        self.assigned: dict[asyncio.StreamWriter, ServerConnection] = {}
+        self.greeting = b""
+        self.servers: list[ServerConnection] = []
+        self.tasks: list[asyncio.Task] = []
+
+    async def start(self) -> int:
+        for _ in range(self.pool_size):
+            server = await self._open_server()
+            self.servers.append(server)
+            self.idle.put_nowait(server)
+            self.tasks.append(asyncio.create_task(self._pump(server)))
+        self.listener = await asyncio.start_server(self._client, "127.0.0.1", 0)
+        return self.listener.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        self.listener.close()
+        for task in self.tasks:
+            task.cancel()
+        for server in self.servers:
+            server.writer.close()
+
+    async def _open_server(self) -> ServerConnection:
+        reader, writer = await asyncio.open_connection(self.url.host, self.url.port)
+        params = f"user\0{self.url.username}\0database\0{self.url.database}\0\0".encode()
+        writer.write(struct.pack("!II", len(params) + 8, 3 << 16) + params)
+        client_first_bare = f"n=,r={base64.b64encode(os.urandom(18)).decode()}"
+        greeting = b""
+        while True:
+            kind, body = await read_message(reader)
+            code = struct.unpack("!I", body[:4])[0] if kind == b"R" else None
+            if code == 10:
+                first = f"n,,{client_first_bare}".encode()
+                writer.write(pack(b"p", b"SCRAM-SHA-256\0" + struct.pack("!I", len(first)) + first))
+            elif code == 11:
+                proof = scram_proof(self.url.password, client_first_bare, body[4:].decode())
+                writer.write(pack(b"p", proof.encode()))
+            elif code not in (None, 0, 12):
+                raise ConnectionError(f"unsupported auth method {code}")
+            elif kind in (b"S", b"K"):
+                greeting += pack(kind, body)
+            elif kind == b"E":
+                raise ConnectionError(body)
+            elif kind == b"Z":
+                break
+        # AuthenticationOk, параметры сервера, ReadyForQuery
+        self.greeting = pack(b"R", struct.pack("!I", 0)) + greeting + pack(b"Z", b"I")
+        return ServerConnection(reader, writer)
+
+    async def _pump(self, server: ServerConnection) -> None:
+        while True:
+            kind, body = await read_message(server.reader)
+            server.owner.write(pack(kind, body))
+            if kind == b"Z" and body == b"I":
+                del self.assigned[server.owner]
+                server.owner = None
+                self.idle.put_nowait(server)
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            startup = await read_startup(reader)
+            if startup == b"N":
+                writer.write(b"N")
+                startup = await read_startup(reader)
+            if startup is None:
+                return
+            writer.write(self.greeting)
+            while True:
+                kind, body = await read_message(reader)
+                if kind == b"X":
+                    return
+                server = self.assigned.get(writer)
+                if server is None:
+                    server = self.assigned[writer] = await self.idle.get()
+                    server.owner = writer
+                server.writer.write(pack(kind, body))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+@pytest.fixture
+async def proxy_url(db_engine):
+    proxy = TransactionPoolProxy(db_engine.url)
+    port = await proxy.start()
+    yield db_engine.url.set(host="127.0.0.1", port=port)
+    await proxy.close()
+
+
+async def run_transactions(engine) -> None:
+    """Одно клиентское соединение, один и тот же запрос в двух транзакциях"""
+    from src.Models.User import User
+
+    async with engine.connect() as connection:
+        for _ in range(2):
+            await connection.execute(select(User.id).where(User.id == 1))
+            await connection.commit()
+
+
+async def test_internal_mode_breaks_on_shared_server_connections(proxy_url):
+    from src.config.pool import engine_options
+
+    engine = create_async_engine(proxy_url, **engine_options("internal"))
+    try:
+        # statement из кэша asyncpg подготовлен на другом серверном соединении
+        with pytest.raises(exc.DBAPIError, match="prepared statement .* does not exist"):
+            await run_transactions(engine)
+    finally:
+        await engine.dispose()
+
+
+async def test_external_mode_works_on_shared_server_connections(proxy_url):
+    from src.config.pool import engine_options
+
+    engine = create_async_engine(proxy_url, **engine_options("external"))
+    try:
+        await asyncio.gather(*(run_transactions(engine) for _ in range(20)))
+    finally:
+        await engine.dispose()
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.security.refresh_tokens import RefreshTokenStore
+
+pytestmark = pytest.mark.anyio
+
+TTL = 600
+
+
+@pytest.fixture
+async def redis():
+    redis = FakeAsyncRedis(decode_responses=True)
+    yield redis
+    await redis.aclose()
+
+
+@pytest.fixture
+def store(redis):
+    return RefreshTokenStore(redis, max_sessions=3)
+
+
+@pytest.mark.parametrize("clients", [2, 10, 50])
+async def test_concurrent_rotation_of_one_token(redis, store, clients):
+    await store.issue(1, "old", TTL)
+
+    results = await asyncio.gather(*(store.rotate("old", f"new-{i}", 1, TTL) for i in range(clients)))
+
+    assert results.count(True) == 1
+    winner = f"refresh:new-{results.index(True)}"
+    # проигравшие — повторное использование: новых сессий они не получили
+    assert await redis.keys("refresh:*") == [winner]
+    assert await redis.zrange("sessions:1", 0, -1) == [winner]
+    assert not await store.rotate("old", "again", 1, TTL)
+
+
+async def test_rotation_with_foreign_user_id_revokes_token(redis, store):
+    await store.issue(1, "old", TTL)
+
+    assert not await store.rotate("old", "new", 2, TTL)
+    assert await redis.keys("refresh:*") == []
+
+
+async def test_session_limit_evicts_oldest(redis, store):
+    for i in range(5):
+        await store.issue(1, f"t{i}", TTL)
+
+    assert sorted(await redis.keys("refresh:*")) == ["refresh:t2", "refresh:t3", "refresh:t4"]
+    assert await store.revoke_all(1) == 3
+    assert await redis.keys("*") == []
+
+
+async def test_session_limit_keeps_new_sessions_issued_in_one_second(redis, store):
+    store.max_sessions = 2
+    # имена не в порядке выдачи: при равном счёте ZSET упорядочил бы их по имени
+    for token in ("m", "z", "a"):
+        await store.issue(1, token, TTL)
+
+    assert sorted(await redis.keys("refresh:*")) == ["refresh:a", "refresh:z"]
+    assert await store.rotate("z", "b", 1, TTL)
+    await store.issue(1, "c", TTL)
+    assert sorted(await redis.keys("refresh:*")) == ["refresh:b", "refresh:c"]
+
+
+async def test_revoke_all_many_in_batches(redis, store):
+    store.BATCH_SIZE = 2
+    for user_id in range(5):
+        await store.issue(user_id, f"t{user_id}", TTL)
+
+    assert await store.revoke_all_many(list(range(5))) == 5
+    assert await redis.keys("*") == []
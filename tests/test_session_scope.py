@@ -0,0 +1,67 @@
+from typing import Annotated
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI, Request
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def app(db_engine):
+    from src.di.dependencies import get_count_cache, get_user_cache, get_user_repository
+    from src.repositories.user_repository import UserRepository
+
+    events = []
+    app = FastAPI()
+    app.state.events = events
+    app.dependency_overrides[get_user_cache] = lambda: None
+    app.dependency_overrides[get_count_cache] = lambda: None
+
+    @app.middleware("http")
+    async def record_response(request: Request, call_next):
+        response = await call_next(request)
+        events.append("response")
+        return response
+
+    @app.post("/write")
+    async def write(repository: Annotated[UserRepository, Depends(get_user_repository)]):
+        repository.session.info["has_writes"] = True
+
+        async def callback() -> None:
+            events.append("after_commit")
+
+        repository.after_commit(callback)
+        events.append("handler")
+        return {}
+
+    @app.post("/failing-callback")
+    async def failing_callback(repository: Annotated[UserRepository, Depends(get_user_repository)]):
+        repository.session.info["has_writes"] = True
+
+        async def bump() -> None:
+            raise ConnectionError("redis is down")
+
+        async def invalidate() -> None:
+            events.append("invalidate")
+
+        repository.after_commit(bump)
+        repository.after_commit(invalidate)
+        return {}
+
+    return app
+
+
+async def test_commit_and_after_commit_run_before_response(app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as client:
+        assert (await client.post("/write")).status_code == 200
+    assert app.state.events == ["handler", "after_commit", "response"]
+
+
+async def test_failed_after_commit_callback_fails_request(app, caplog):
+    transport = httpx.ASGITransport(app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.post("/failing-callback")).status_code == 500
+    # остальные колбэки выполнены, ошибка в логе
+    assert "invalidate" in app.state.events
+    assert "redis is down" in caplog.text
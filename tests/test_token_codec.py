@@ -0,0 +1,105 @@
+import json
+import time
+
+import jwt as pyjwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+from src.security.token_codec import TokenCodec, b64url_encode
+
+SECRET = "test-secret-key-with-enough-length-123"
+
+
+def hmac_codec(algorithm: str = "HS256") -> TokenCodec:
+    return TokenCodec(SECRET, algorithm, access_ttl=60, refresh_ttl=600)
+
+
+def pem(private_key) -> bytes:
+    return private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+
+
+def segment(value) -> str:
+    return b64url_encode(json.dumps(value).encode()).decode()
+
+
+def payload(**extra) -> dict:
+    return {"sub": "1", "exp": int(time.time()) + 60, "type": "access", **extra}
+
+
+@pytest.mark.parametrize("algorithm", ["HS256", "HS384", "HS512"])
+def test_hmac_parity_with_pyjwt(algorithm):
+    codec = hmac_codec(algorithm)
+    data = payload(role="admin", ver=3)
+    assert pyjwt.decode(codec.encode(data), SECRET, algorithms=[algorithm]) == data
+    assert codec.decode(pyjwt.encode(data, SECRET, algorithm=algorithm)) == data
+
+
+@pytest.mark.parametrize(
+    ("algorithm", "private_key"),
+    [("ES256", ec.generate_private_key(ec.SECP256R1())), ("EdDSA", ed25519.Ed25519PrivateKey.generate())],
+)
+def test_asymmetric_parity_with_pyjwt(algorithm, private_key):
+    codec = TokenCodec(pem(private_key), algorithm, access_ttl=60, refresh_ttl=600, kid="k1")
+    data = payload()
+    token = codec.encode(data)
+    assert pyjwt.get_unverified_header(token)["kid"] == "k1"
+    assert pyjwt.decode(token, private_key.public_key(), algorithms=[algorithm]) == data
+    assert codec.decode(pyjwt.encode(data, private_key, algorithm=algorithm, headers={"kid": "k1"})) == data
+
+
+def test_rotated_key_still_verifies():
+    old_key, new_key = ec.generate_private_key(ec.SECP256R1()), ec.generate_private_key(ec.SECP256R1())
+    old = TokenCodec(pem(old_key), "ES256", 60, 600, kid="old")
+    new = TokenCodec(pem(new_key), "ES256", 60, 600, kid="new", verify_keys={"old": pem(old_key)})
+    token = old.encode(payload())
+    assert new.decode(token) is not None
+    assert TokenCodec(pem(new_key), "ES256", 60, 600, kid="new").decode(token) is None
+
+
+def test_expired_token():
+    codec = hmac_codec()
+    assert codec.decode(codec.encode(payload(exp=int(time.time()) - 1))) is None
+    assert codec.decode(codec.encode(payload(exp="never"))) is None
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        "abc",
+        "a.b",
+        "a.b.c.d",
+        "!!!.@@@.###",
+        # заголовок — валидный JSON, но не объект
+        "WzFd." + segment(payload()) + ".c2ln",
+        segment("HS256") + "." + segment(payload()) + ".c2ln",
+    ],
+)
+def test_malformed_token(token):
+    assert hmac_codec().decode(token) is None
+
+
+def test_non_object_payload_with_valid_signature():
+    token = pyjwt.api_jws.encode(b"[1]", SECRET, algorithm="HS256")
+    assert hmac_codec().decode(token) is None
+
+
+def test_wrong_signature_and_algorithm():
+    codec = hmac_codec()
+    assert codec.decode(pyjwt.encode(payload(), "another-secret-key-with-enough-length", algorithm="HS256")) is None
+    assert codec.decode(pyjwt.encode(payload(), SECRET, algorithm="HS384")) is None
+    unsigned = segment({"alg": "none", "typ": "JWT"}) + "." + segment(payload()) + "."
+    assert codec.decode(unsigned) is None
+
+
+def test_header_with_non_hashable_kid():
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    codec = TokenCodec(pem(private_key), "ES256", 60, 600, kid="k1")
+    token = segment({"alg": "ES256", "typ": "JWT", "kid": ["k1"]}) + "." + segment(payload()) + ".c2ln"
+    assert codec.decode(token) is None
+
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from src.cache.invalidation import CacheInvalidator
+from src.security.token_version import TokenVersionStore
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def redis():
+    redis = FakeAsyncRedis(decode_responses=True)
+    yield redis
+    await redis.aclose()
+
+
+@pytest.fixture
+def store(redis):
+    CacheInvalidator.clear()
+    yield TokenVersionStore(redis, local=CacheInvalidator.token_versions())
+    CacheInvalidator.clear()
+
+
+async def test_read_before_bump_does_not_leave_stale_version(redis, store, monkeypatch):
+    read, bumped = asyncio.Event(), asyncio.Event()
+    get = redis.get
+
+    async def slow_get(key):
+        value = await get(key)
+        read.set()
+        await bumped.wait()
+        return value
+
+    monkeypatch.setattr(redis, "get", slow_get)
+    # параллельный запрос прочитал версию до INCR, а в L1 кладёт её уже после bump
+    reader = asyncio.create_task(store.get(1))
+    await read.wait()
+    assert await store.bump(1) == 1
+    bumped.set()
+    assert await reader == 0
+
+    assert await store.get(1) == 1
+
+
+async def test_invalidation_keeps_newer_version():
+    CacheInvalidator.clear()
+    local = CacheInvalidator.token_versions()
+    local.set(1, 3)
+    local.set(2, 1)
+
+    CacheInvalidator._apply("1:2")
+    CacheInvalidator._apply("2:2")
+
+    assert local.get(1) == 3
+    assert local.get(2) == 2
+    CacheInvalidator.clear()
+
+
+async def test_bump_many_publishes_new_versions(redis, store):
+    store.BATCH_SIZE = 2
+    await store.bump(1)
+    async with redis.pubsub() as pubsub:
+        await pubsub.subscribe(CacheInvalidator._channel())
+        await store.bump_many([1, 2, 3])
+        messages = []
+        while len(messages) < 2:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+            if message is not None:
+                messages.append(message["data"])
+
+    assert messages == ["1:2,2:1", "3:1"]
+    assert [await store.get(user_id) for user_id in (1, 2, 3)] == [2, 1, 1]